@@ -1,30 +1,36 @@
 from collections import OrderedDict
 from functools import reduce
-from typing import Optional, Generator, Union, Any
+from typing import Optional, Generator, Union, Any, Iterable
 
 from bitarray import bitarray, frozenbitarray as fbarray
-from bitarray.util import zeros as bazeros, subset as basubset
+from bitarray.util import zeros as bazeros, any_and
 
 from paspailleur.pattern_structures.pattern import Pattern
 
 
+def indices_to_bitarray(indices: Iterable[int], length: int) -> bitarray:
+    """Return the bitarray of given length whose 'True' elements are at `indices`, setting all the bits at once"""
+    ba = bazeros(length)
+    ba[list(indices)] = True
+    return ba
+
+
 def extension(pattern: Pattern, objects_per_pattern: dict[Pattern, bitarray]) -> bitarray:
     """Return the set of objects whose patterns are more precise than `pattern`.
 
     `objects_per_pattern` matches objects' patterns with the objects themselves
     (in case some objects share the same patterns)
     """
-    n_objects = len(list(objects_per_pattern.values())[0])
-    empty_extent = bazeros(n_objects)
-    super_patterns = (ptrn for ptrn in objects_per_pattern if pattern <= ptrn)
-    sub_extents = (objects_per_pattern[ptrn] for ptrn in super_patterns)
-    return reduce(fbarray.__or__, sub_extents, empty_extent)
+    n_objects = len(next(iter(objects_per_pattern.values())))
+    extent = bazeros(n_objects)
+    for ptrn, objects in objects_per_pattern.items():
+        if pattern <= ptrn:
+            extent |= objects  # in-place, so no new bitarray is allocated per super pattern
+    return extent
 
 
 def intention(objects: bitarray, objects_per_pattern: dict[Pattern, bitarray]) -> Optional[Pattern]:
-    super_patterns = [ptrn for ptrn, irr_ext in objects_per_pattern.items()
-                      if basubset(objects, irr_ext)] #if basubset(irr_ext, objects)]
-    super_patterns = [ptrn for ptrn, irr_ext in objects_per_pattern.items() if (objects & irr_ext).any()]
+    super_patterns = [ptrn for ptrn, irr_ext in objects_per_pattern.items() if any_and(objects, irr_ext)]
     if super_patterns:
         first_pattern = super_patterns[0]
         return reduce(first_pattern.__class__.__and__, super_patterns, first_pattern)
@@ -36,7 +42,7 @@ def intention(objects: bitarray, objects_per_pattern: dict[Pattern, bitarray]) -
 
 
 def minimal_pattern(objects_per_pattern: dict[Pattern, bitarray]) -> Pattern:
-    some_pattern = next(pattern for pattern in objects_per_pattern)
+    some_pattern = next(iter(objects_per_pattern))
     if some_pattern.min_pattern is not None:
         return some_pattern.min_pattern
 
@@ -44,7 +50,7 @@ def minimal_pattern(objects_per_pattern: dict[Pattern, bitarray]) -> Pattern:
 
 
 def maximal_pattern(objects_per_pattern: dict[Pattern, bitarray]) -> Pattern:
-    some_pattern = next(pattern for pattern in objects_per_pattern)
+    some_pattern = next(iter(objects_per_pattern))
     if some_pattern.max_pattern is not None:
         return some_pattern.max_pattern
 
@@ -52,13 +58,13 @@ def maximal_pattern(objects_per_pattern: dict[Pattern, bitarray]) -> Pattern:
 
 
 def group_objects_by_patterns(objects_patterns: list[Pattern]) -> dict[Pattern, bitarray]:
-    empty_extent = bazeros(len(objects_patterns))
-
-    objects_by_patterns = dict()
+    objects_idxs_by_patterns: dict[Pattern, list[int]] = dict()
     for g_idx, pattern in enumerate(objects_patterns):
-        if pattern not in objects_by_patterns:
-            objects_by_patterns[pattern] = empty_extent.copy()
-        objects_by_patterns[pattern][g_idx] = True
+        objects_idxs_by_patterns.setdefault(pattern, []).append(g_idx)
+
+    n_objects = len(objects_patterns)
+    objects_by_patterns = {pattern: indices_to_bitarray(objects_idxs, n_objects)
+                           for pattern, objects_idxs in objects_idxs_by_patterns.items()}
 
     assert sum(objs.count() for objs in objects_by_patterns.values()) == len(objects_patterns)
 
@@ -70,7 +76,7 @@ def iter_patterns_ascending(
         greater_patterns_ordering: list[bitarray],
         controlled_iteration: bool = False
 ) -> Generator[Union[Pattern, tuple[Pattern, Any]], bool, None]:
-    assert all(not greater_ptrns[:i].any() for i, greater_ptrns in enumerate(greater_patterns_ordering)), \
+    assert all(not greater_ptrns.count(1, 0, i) for i, greater_ptrns in enumerate(greater_patterns_ordering)), \
         'The list of `patterns` from the smaller to the greater patterns. ' \
         'So for every i-th pattern, there should be no greater patter among patterns[:i]'
 
@@ -80,8 +86,9 @@ def iter_patterns_ascending(
     if controlled_iteration:
         yield  # Initialisation
 
-    while patterns_to_pass.any():
-        i = patterns_to_pass.find(True)
+    # greater patterns always come after the current one, so the search for the next pattern resumes after it
+    i = patterns_to_pass.find(True)
+    while i != -1:
         patterns_to_pass[i] = False
 
         pattern = patterns_list[i]
@@ -89,3 +96,4 @@ def iter_patterns_ascending(
         go_more_precise = yield yielded_value
         if controlled_iteration and not go_more_precise:
             patterns_to_pass &= ~greater_patterns_ordering[i]
+        i = patterns_to_pass.find(True, i + 1)
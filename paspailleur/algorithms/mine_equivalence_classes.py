@@ -1,12 +1,12 @@
 import heapq
 from functools import reduce
 from itertools import takewhile
-from collections import OrderedDict
+from collections import OrderedDict, deque
 
 from tqdm.auto import tqdm
 from typing import Iterator, Generator, Collection, Iterable, Optional
 from bitarray import bitarray, frozenbitarray as fbarray
-from bitarray.util import zeros as bazeros, subset as basubset
+from bitarray.util import zeros as bazeros, subset as basubset, count_and, any_and, ba2int, int2ba
 
 from paspailleur.algorithms import base_functions as bfuncs
 from paspailleur.pattern_structures import AbstractPS
@@ -30,65 +30,61 @@ def list_intents_via_Lindig_complex(data: list, pattern_structure: AbstractPS) -
         list of intents of pattern concepts
     """
 
-    class NotFound(Exception):
-        pass
-
     def compute_bits_intersection(bits: list[bitarray], len_bitarray):
-        if bits == []:
-            return(bitarray([1 for _ in range(len_bitarray)]))
-        bit = bits[0]
+        if not bits:
+            return ~bazeros(len_bitarray)
+        if len(bits) == 1:
+            return bits[0]
+        bit = bitarray(bits[0])
         for obj in bits[1:]:
-            bit = bit & obj
-        return(bit)
+            bit &= obj
+        return bit
 
-    def find_upper_neighbors(data: list, concept_extent: list, objects_indices: list):
-        min_set = [obj for obj in objects_indices if obj not in concept_extent]
-        concept_extent_values = [data[i] for i in concept_extent]
+    def find_upper_neighbors(data: list, concept_extent: fbarray) -> list[tuple[fbarray, 'PatternDescription']]:
+        outer_objects = ~concept_extent
+        min_set = bitarray(outer_objects)
+        concept_extent_values = [data[i] for i in concept_extent.search(True)]
         neighbors = []
 
-        for g in [obj for obj in objects_indices if obj not in concept_extent]:
+        for g in outer_objects.search(True):
             B1 = ps.intent(concept_extent_values + [data[g]])
-            A1 = list(ps.extent(B1, data))
-            if len(set(min_set) & set([obj for obj in A1 if obj not in concept_extent and obj not in [g]])) == 0:
-                neighbors.append(A1)
+            A1 = bazeros(len(data))
+            A1[list(ps.extent(data, B1))] = True
+
+            new_objects = A1 & outer_objects
+            new_objects[g] = False
+            if any_and(min_set, new_objects):
+                min_set[g] = False
             else:
-                min_set.remove(g)
+                neighbors.append((fbarray(A1), B1))  # B1 is closed, i.e. it is the intent of A1
         return neighbors
 
-    def find_next_concept_extent(data: list, concept_extent: list, List_extents: list):
-        bin_col_names, rows = ps.binarize(data)
-        next_concept_extent = None
-        concept_extent_bit = compute_bits_intersection([rows[i] for i in concept_extent], len(rows[0]))
-        for extent in List_extents:
-            extent_bit = compute_bits_intersection([rows[i] for i in extent], len(rows[0]))
-            if extent_bit < concept_extent_bit and (next_concept_extent is None or extent_bit > next_concept_extent_bit):
-                next_concept_extent = extent
-                next_concept_extent_bit = compute_bits_intersection([rows[i] for i in next_concept_extent], len(rows[0]))
-        if next_concept_extent is not None:
-            return next_concept_extent
-        raise NotFound("Next concept not found in Lattice")
-
     ps = pattern_structure
-    Lattice_data_extents = []  # extents set
-    concept_extent = []  # Initial concept extent
-    objects_indices = list(ps.extent([], data))
-    Lattice_data_extents.append(concept_extent)  # Insert the initial concept extent into Lattice
+    # binarised rows do not change during the run, so the intent bits of every extent are computed only once
+    bin_col_names, rows = ps.binarize(data)
+    extents_bits: dict[fbarray, bitarray] = {}
+    # Upper neighbours have smaller intents, so their intent bits are lexicographically smaller than the current ones.
+    # Hence, the next concept to visit is the not visited one with the lexicographically greatest intent bits.
+    # It is popped from a heap ordered by inverted intent bits instead of scanning all the found extents.
+    extents_to_visit: list[tuple[bitarray, int, fbarray]] = []
+
+    Lattice_data: list[tuple[fbarray, 'PatternDescription']] = []  # pairs of extents and intents
+    concept_extent = fbarray(bazeros(len(data)))  # Initial concept extent
+    Lattice_data.append((concept_extent, ps.intent(data, [])))  # Insert the initial concept into Lattice
+    extents_bits[concept_extent] = compute_bits_intersection([], len(rows[0]))
 
     while True:
-        for parent in find_upper_neighbors(data, concept_extent, objects_indices):
-            if parent not in Lattice_data_extents:
-              Lattice_data_extents.append(parent)
+        for parent, parent_intent in find_upper_neighbors(data, concept_extent):
+            if parent not in extents_bits:
+                Lattice_data.append((parent, parent_intent))
+                extents_bits[parent] = compute_bits_intersection([rows[i] for i in parent.search(True)], len(rows[0]))
+                heapq.heappush(extents_to_visit, (~extents_bits[parent], len(Lattice_data), parent))
 
-        try:
-            concept_extent = find_next_concept_extent(data, concept_extent, Lattice_data_extents)
-        except NotFound:
+        if not extents_to_visit:
             break
+        concept_extent = heapq.heappop(extents_to_visit)[2]
 
-    Lattice_data_intents = []
-    for i in range(len(Lattice_data_extents)):
-        Lattice_data_intents.append(ps.intent([data[j] for j in Lattice_data_extents[i]]))
-
-    return Lattice_data_intents
+    return [intent for _, intent in Lattice_data]
 
 
 def iter_intents_via_ocbo(
@@ -97,25 +93,46 @@ def iter_intents_via_ocbo(
     """Iterate intents in patterns by running object-wise version of Close By One algorithm"""
     objects_per_pattern = bfuncs.group_objects_by_patterns(objects_patterns)
 
-    n_objects = len(objects_patterns)
+    n_objects, n_irreducibles = len(objects_patterns), len(objects_per_pattern)
+    meet_func = objects_patterns[0].__class__.__and__ if objects_patterns else None
+    # Extents are stored as Python ints, whose bitwise operations and popcounts take a single call per extent.
+    # The bit order is the one of `ba2int`: object `g` is the bit `n_objects-1-g`
+    irreducibles_extents = [(ptrn, ba2int(objects)) for ptrn, objects in objects_per_pattern.items()]
+
     # create a stack of pairs: 'known_extent', 'object_to_add'
-    stack: list[tuple[bitarray, int]] = [(bazeros(n_objects), -1)]
+    stack: list[tuple[int, int]] = [(0, -1)]
     while stack:
         known_extent, object_to_add = stack.pop()
-        proto_extent = known_extent.copy()
-        if object_to_add >= 0:
-            proto_extent[object_to_add] = True
-
-        intent = bfuncs.intention(proto_extent, objects_per_pattern)
-        extent = bfuncs.extension(intent, objects_per_pattern)
-
-        has_objects_not_in_lex_order = (object_to_add >= 0) and (extent & ~proto_extent)[:object_to_add].any()
+        proto_extent = known_extent | (1 << (n_objects-1-object_to_add)) if object_to_add >= 0 else known_extent
+
+        # A sparse extent is cheaper to describe by the patterns of its own objects
+        # than by testing the extents of all the object-irreducible patterns
+        n_proto_objects = proto_extent.bit_count()
+        if not n_proto_objects:
+            intent = bfuncs.intention(bazeros(n_objects), objects_per_pattern)
+        else:
+            if n_proto_objects < n_irreducibles:
+                proto_objects = int2ba(proto_extent, n_objects).search(True)
+                super_patterns = list(dict.fromkeys(objects_patterns[g] for g in proto_objects))
+            else:
+                super_patterns = [ptrn for ptrn, objects in irreducibles_extents if objects & proto_extent]
+            # the first pattern is met with itself too, so that even a single pattern is normalised by the meet
+            intent = reduce(meet_func, super_patterns, super_patterns[0])
+
+        extent = 0
+        for ptrn, objects in irreducibles_extents:
+            if intent <= ptrn:
+                extent |= objects
+
+        # `proto_extent` is a subset of `extent`, so they differ on the first objects iff their high bits differ
+        has_objects_not_in_lex_order = (object_to_add >= 0) and \
+            bool((extent ^ proto_extent) >> (n_objects-object_to_add))
         if has_objects_not_in_lex_order:
             continue
 
-        yield intent, extent
-        next_steps = [(extent, g) for g in extent.search(False, object_to_add+1)]
-        stack.extend(next_steps[::-1])
+        extent_ba = int2ba(extent, n_objects)
+        yield intent, extent_ba
+        stack.extend((extent, g) for g in extent_ba.search(False, object_to_add+1, right=True))
 
 
 def iter_all_patterns_ascending(
@@ -127,32 +144,45 @@ def iter_all_patterns_ascending(
     # For the start, let us just rewrite CloseByOne algorithm
     # with no though on how to optimise it for this particular case
     atomic_patterns = list(atomic_patterns_extents)
+    atomic_extents = list(atomic_patterns_extents.values())  # to access extents by index and not by pattern's hash
     first_pattern = atomic_patterns[0]
-    total_extent = atomic_patterns_extents[first_pattern] | ~atomic_patterns_extents[first_pattern]
+    total_extent = fbarray(atomic_extents[0] | ~atomic_extents[0])
     meet_func, join_func = first_pattern.__class__.__and__, first_pattern.__class__.__or__
 
-    min_pattern = reduce(meet_func, atomic_patterns) if first_pattern.min_pattern is None else first_pattern.min_pattern
+    min_pattern = first_pattern.min_pattern  # the property constructs a new pattern on every call, so call it once
+    if min_pattern is None:
+        min_pattern = reduce(meet_func, atomic_patterns)
     if controlled_iteration:
         yield  # for initialisation
 
-    # create a stack of pairs: 'involved_patterns', 'pattern_to_add'
+    # create a stack of quadruples: 'involved_patterns', 'pattern_to_add',
+    # 'involved_pattern' (i.e. the join of involved patterns), and 'involved_extent' (i.e. the extent of involved_pattern)
     n_atoms = len(atomic_patterns_extents)
-    stack: list[tuple[bitarray, int]] = [(bazeros(n_atoms), -1)]
+    stack: deque[tuple[bitarray, int, Pattern, fbarray]] = deque([(bazeros(n_atoms), -1, min_pattern, total_extent)])
     while stack:
-        involved_patterns, pattern_to_add = stack.pop()
+        involved_patterns, pattern_to_add, involved_pattern, involved_extent = stack.pop()
         proto_closure = involved_patterns.copy()
         if pattern_to_add != -1:
             proto_closure[pattern_to_add] = True
 
-        proto_closure_extents = (atomic_patterns_extents[atomic_patterns[i]] for i in proto_closure.search(True))
-        extent = reduce(bitarray.__and__, proto_closure_extents, total_extent)
-        if extent.count() < min_support:
+        # only check the support of the new atom without materialising the intersection of extents
+        extent = involved_extent
+        if pattern_to_add != -1:
+            new_atom_extent = atomic_extents[pattern_to_add]
+            if count_and(extent, new_atom_extent) < min_support:
+                continue
+            extent = fbarray(extent & new_atom_extent)
+        elif extent.count() < min_support:
             continue
 
-        new_pattern = reduce(join_func, (atomic_patterns[i] for i in proto_closure.search(True)), min_pattern)
+        # all the involved patterns are less precise than `involved_pattern`, so only one join is needed
+        new_pattern = join_func(involved_pattern, atomic_patterns[pattern_to_add]) if pattern_to_add != -1 \
+            else involved_pattern
+        # An atom can be less precise than `new_pattern` only if the atom's extent contains the `extent`.
+        # So the cheap subset test on extents filters out most of the atoms before comparing the patterns themselves
         has_atoms_not_in_lex_order = (pattern_to_add != -1) and any(
             atomic_patterns[i] <= new_pattern
-            for i in involved_patterns.search(False, 0, pattern_to_add)
+            for i in involved_patterns.search(False, 0, pattern_to_add) if basubset(extent, atomic_extents[i])
         )
         if has_atoms_not_in_lex_order:
             continue
@@ -162,10 +192,15 @@ def iter_all_patterns_ascending(
             continue
 
         closure = proto_closure.copy()
-        for i in proto_closure.search(False, pattern_to_add + 1):
-            closure[i] = atomic_patterns[i] <= new_pattern
-        previous_pattern_next_steps = [(closure, i) for i in closure.search(False, pattern_to_add + 1)][::-1]
-        stack = stack + previous_pattern_next_steps if depth_first else previous_pattern_next_steps + stack
+        closure[[i for i in proto_closure.search(False, pattern_to_add + 1)
+                 if basubset(extent, atomic_extents[i]) and atomic_patterns[i] <= new_pattern]] = True
+        # the extents of the atoms added to the closure contain `extent`, so `extent` is the extent of the closure
+        previous_pattern_next_steps = ((closure, i, new_pattern, extent)
+                                       for i in closure.search(False, pattern_to_add + 1, right=True))
+        if depth_first:
+            stack.extend(previous_pattern_next_steps)
+        else:
+            stack.extendleft(reversed(list(previous_pattern_next_steps)))
 
 
 def list_stable_extents_via_gsofia(
@@ -208,13 +243,13 @@ def list_stable_extents_via_gsofia(
             min_stability=min_delta_stability
     ) -> tuple[Optional[int], Optional[set[fbarray]]]:
         # Find the delta-index of the new extent and its children extents, aka "InitNewPattern" in the gSofia paper
-        new_delta, new_children = new_extent.count(), []
+        n_new_extent = new_extent.count()
+        new_delta, new_children = n_new_extent, []
         for child in old_children:
-            child_new = child & new_atomic_extent
-            new_delta = min(new_delta, new_extent.count() - child_new.count())
+            new_delta = min(new_delta, n_new_extent - count_and(child, new_atomic_extent))
             if new_delta < min_stability:
                 return new_delta, None
-            new_children.append(child_new)
+            new_children.append(child & new_atomic_extent)
         return new_delta, maximal_bitarrays(new_children)
 
     if not atomic_patterns_iterator.gi_suspended:
@@ -244,20 +279,23 @@ def list_stable_extents_via_gsofia(
         old_stable_extents, stable_extents = dict(stable_extents), dict()
         refine_previous_pattern = False
         for extent, (delta, children) in old_stable_extents.items():
-            # Create new extent
-            extent_new: fbarray = extent & atomic_extent
-            if extent_new == extent:
+            # Count the new extent before creating it: the new extent equals the old one iff their supports are equal
+            n_extent, n_extent_new = extent.count(), count_and(extent, atomic_extent)
+            if n_extent_new == n_extent:
                 stable_extents[extent] = delta, children
                 refine_previous_pattern = True
                 continue
 
+            # Create new extent
+            extent_new: fbarray = extent & atomic_extent
+
             # Update the stability of the old extent given its new child: `extent_new`
-            delta = min(delta, extent.count() - extent_new.count())
+            delta = min(delta, n_extent - n_extent_new)
             if delta >= min_delta_stability:
                 stable_extents[extent] = delta, children | {extent_new}
 
             # Skip the new extent if it is too small
-            if extent_new.count() < min_supp:
+            if n_extent_new < min_supp:
                 # the pattern is to rare, so all refined (i.e. more precise) objects_patterns would be even rarer
                 continue
 
@@ -0,0 +1,120 @@
+from functools import lru_cache
+from typing import Hashable, Sequence, Iterable, Iterator
+
+
+class SubNgramAutomaton:
+    """Suffix automaton that recognises every sub-ngram (i.e. contiguous part) of the added ngrams
+
+    Both adding an ngram and testing whether an ngram is contained in some added ngram
+    take time linear in the size of the ngram.
+    """
+    def __init__(self):
+        self._transitions: list[dict[Hashable, int]] = [{}]
+        self._lengths: list[int] = [0]
+        self._links: list[int] = [-1]
+
+    def add(self, ngram: Sequence[Hashable]):
+        """Add all sub-ngrams of `ngram` to the automaton"""
+        last = 0
+        for word in ngram:
+            last = self._extend(last, word)
+
+    def __contains__(self, ngram: Sequence[Hashable]) -> bool:
+        """Return True if `ngram` is a sub-ngram of some ngram added to the automaton"""
+        state = 0
+        for word in ngram:
+            state = self._transitions[state].get(word)
+            if state is None:
+                return False
+        return True
+
+    def _new_state(self, length: int, link: int, transitions: dict[Hashable, int] = None) -> int:
+        self._transitions.append(dict(transitions) if transitions is not None else {})
+        self._lengths.append(length)
+        self._links.append(link)
+        return len(self._lengths) - 1
+
+    def _clone(self, p: int, q: int, word: Hashable) -> int:
+        clone = self._new_state(self._lengths[p] + 1, self._links[q], self._transitions[q])
+        while p != -1 and self._transitions[p].get(word) == q:
+            self._transitions[p][word] = clone
+            p = self._links[p]
+        self._links[q] = clone
+        return clone
+
+    def _extend(self, last: int, word: Hashable) -> int:
+        transitions, lengths, links = self._transitions, self._lengths, self._links
+        if word in transitions[last]:  # the prefix is already known from some previously added ngram
+            q = transitions[last][word]
+            return q if lengths[q] == lengths[last] + 1 else self._clone(last, q, word)
+
+        cur = self._new_state(lengths[last] + 1, 0)
+        p = last
+        while p != -1 and word not in transitions[p]:
+            transitions[p][word] = cur
+            p = links[p]
+        if p == -1:
+            return cur
+
+        q = transitions[p][word]
+        links[cur] = q if lengths[p] + 1 == lengths[q] else self._clone(p, q, word)
+        return cur
+
+
+def is_subngram(ngram_a: tuple[Hashable, ...], ngram_b: tuple[Hashable, ...]) -> bool:
+    """Return True if `ngram_a` is a sub-ngram (i.e. contiguous part) of `ngram_b`
+
+    Candidate positions are found with `tuple.index` and verified by comparing the whole slice,
+    so both the search and the verification run in C rather than word by word in Python.
+    """
+    size_a, size_b = len(ngram_a), len(ngram_b)
+    if size_a > size_b:
+        return False
+    if size_a == 0:
+        return True
+
+    first_word, last_start = ngram_a[0], size_b - size_a + 1
+    i = -1
+    try:
+        while True:
+            i = ngram_b.index(first_word, i + 1, last_start)
+            if ngram_b[i:i + size_a] == ngram_a:
+                return True
+    except ValueError:  # no more positions starting with `first_word`
+        return False
+
+
+@lru_cache(maxsize=128)
+def index_words_positions(ngrams: frozenset[tuple]) -> tuple[list[tuple], dict[Hashable, list[tuple[int, int]]]]:
+    """Return the list of `ngrams` and the positions (ngram index, word index) of every word in them
+
+    The index is memoized, so joining the same set of ngrams with many other sets builds the index only once.
+    """
+    ngrams_list = list(ngrams)
+    words_positions: dict[Hashable, list[tuple[int, int]]] = {}
+    for ngram_i, ngram in enumerate(ngrams_list):
+        for i, word in enumerate(ngram):
+            words_positions.setdefault(word, []).append((ngram_i, i))
+    return ngrams_list, words_positions
+
+
+def iter_common_ngrams(ngrams_a: Iterable[tuple], ngrams_b: Iterable[tuple], min_n: int = 1) -> Iterator[tuple]:
+    """Iterate common sub-ngrams of `ngrams_a` and `ngrams_b` that cannot be extended to the left or to the right
+
+    The output ngrams are not necessarily maximal: some of them might be contained in the others.
+    """
+    ngrams_a, words_positions_a = index_words_positions(frozenset(ngrams_a))
+    for ngram_b in ngrams_b:
+        size_b = len(ngram_b)
+        for j, word in enumerate(ngram_b):
+            for ngram_i, i in words_positions_a.get(word, ()):
+                ngram_a = ngrams_a[ngram_i]
+                if i > 0 and j > 0 and ngram_a[i-1] == ngram_b[j-1]:
+                    continue  # the common ngram is a part of the one that starts with the previous words
+
+                size_a, ngram_size = len(ngram_a), 1
+                while i + ngram_size < size_a and j + ngram_size < size_b \
+                        and ngram_a[i + ngram_size] == ngram_b[j + ngram_size]:
+                    ngram_size += 1
+                if ngram_size >= min_n:
+                    yield ngram_a[i:i + ngram_size]
@@ -1,7 +1,7 @@
 from collections import deque
 from dataclasses import dataclass
 from typing import TypeVar, Iterator, Iterable, Union, Optional, Literal
-from bitarray import frozenbitarray as fbarray
+from bitarray import bitarray, frozenbitarray as fbarray
 from bitarray.util import zeros as bazeros
 from tqdm.autonotebook import tqdm
 from deprecation import deprecated
@@ -77,15 +77,18 @@ class AbstractPS:
             attr, extent = queue.popleft()
             yield attr, extent
 
+            # More precise attributes can only describe the objects described by `attr`, so only these are tested
+            extent_idxs = list(extent.search(True))
+            extent_data = [data[i] for i in extent_idxs]
+
             next_attrs = self.closest_more_precise(attr, use_lectic_order=True)
             for next_attr in next_attrs:
-                next_extent = bazeros(len(total_extent))
-                for g_i in self.extent(data, next_attr):
-                    next_extent[g_i] = True
-
-                if next_extent.count() < min_support:
+                next_extent_idxs = [extent_idxs[i] for i in self.extent(extent_data, next_attr)]
+                if len(next_extent_idxs) < min_support:
                     continue
 
+                next_extent = bazeros(len(total_extent))
+                next_extent[next_extent_idxs] = True
                 queue.append((next_attr, fbarray(next_extent)))
 
     @deprecated(deprecated_in='0.1.0', removed_in='0.1.1', details='The function is renamed to `iter_attributes`')
@@ -135,12 +138,12 @@ class AbstractPS:
         """
         patterns, flags = list(zip(*list(self.iter_attributes(data, min_support))))
 
-        n_rows, n_cols = len(flags[0]), len(flags)
-        itemsets_ba = [bazeros(n_cols) for _ in range(n_rows)]
-        for j, flag in enumerate(flags):
-            for i in flag.search(True):
-                itemsets_ba[i][j] = True
-        itemsets_ba = [fbarray(ba) for ba in itemsets_ba]
+        # Stack the flags one after another, so that every row of the formal context is a strided slice of the stack
+        n_rows = len(flags[0])
+        flags_stacked = bitarray()
+        for flag in flags:
+            flags_stacked += flag
+        itemsets_ba = [fbarray(flags_stacked[i::n_rows]) for i in range(n_rows)]
         return list(patterns), itemsets_ba
 
     def preprocess_data(self, data: Iterable, update_params_mode: Literal['write', 'append', False] = 'append') -> Iterator[PatternType]:
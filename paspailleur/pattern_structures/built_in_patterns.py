@@ -1,15 +1,69 @@
 import math
-from typing import Self, Collection, Optional, Sequence, Type
+from ast import literal_eval
+from bisect import bisect_left, bisect_right
+from functools import wraps, partial
+from typing import Self, Collection, Optional, Sequence, Type, Callable, Iterable
 from numbers import Number
 from frozendict import frozendict
 import re
 
 
 from .pattern import Pattern
+from ._ngram_utils import SubNgramAutomaton, is_subngram, iter_common_ngrams
+
+
+def _parse_literal(value: str, default=None):
+    """Return the Python literal written in `value`, or `default` if `value` is not a literal"""
+    try:
+        return literal_eval(value)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return default
+
+
+# (pattern class, property name) => (class parameter the pattern was computed for, the pattern)
+_singleton_patterns: dict[tuple[type, str], tuple[object, Pattern]] = {}
+
+
+def _get_singleton_pattern(cls: type, name: str, make_pattern: Callable[[], Pattern], class_param=None) -> Pattern:
+    """Return the pattern `name` (e.g. `min_pattern`) shared by all instances of `cls`
+
+    The pattern is recomputed only if `class_param` (compared by identity) is changed since the last call.
+    """
+    key = cls, name
+    cached = _singleton_patterns.get(key)
+    if cached is None or cached[0] is not class_param:
+        cached = class_param, make_pattern()
+        _singleton_patterns[key] = cached
+    return cached[1]
+
+
+def _memoize_atomic_patterns(compute_atomic_patterns: Callable[[Pattern], Iterable[Pattern]] = None,
+                             class_param: str = None):
+    """Compute the atomic patterns of a pattern on the first call and return a copy of them on every call
+
+    Patterns are immutable, so their atomic patterns only change together with the class attribute `class_param`
+    (e.g. `Universe`), if the atomic patterns depend on any. A list attribute may be changed in place,
+    so its values are compared and not the list itself.
+    The copy keeps the returned set safe to modify.
+    """
+    if compute_atomic_patterns is None:
+        return partial(_memoize_atomic_patterns, class_param=class_param)
+
+    @wraps(compute_atomic_patterns)
+    def atomic_patterns(self: Pattern) -> set[Pattern]:
+        param_value = getattr(self, class_param) if class_param is not None else None
+        if isinstance(param_value, list):
+            param_value = tuple(param_value)
+        cached = self.__dict__.get('_atomic_patterns')
+        if cached is None or (cached[0] is not param_value and cached[0] != param_value):
+            cached = self._atomic_patterns = param_value, frozenset(compute_atomic_patterns(self))
+        return set(cached[1])
+    return atomic_patterns
 
 
 class ItemSetPattern(Pattern):
     PatternValueType = frozenset
+    _lists_less_precise_atoms = True
 
     @property
     def value(self) -> PatternValueType:
@@ -25,52 +79,51 @@ class ItemSetPattern(Pattern):
         """
         return len(self.value)
 
+    def __and__(self, other: Self) -> Self:
+        """Return self & other, i.e. the most precise pattern that is less precise than both self and other"""
+        return self._from_value(self.value & other.value)
+
+    def __or__(self, other: Self) -> Self:
+        """Return self | other, i.e. the least precise pattern that is more precise than both self and other"""
+        return self._from_value(self.value | other.value)
+
     def __sub__(self, other: Self) -> Self:
         """Return self - other, i.e. the least precise pattern s.t. (self-other)|other == self
 
          (if it's not possible, return self)"""
-        return self.__class__(self.value - other.value)
+        return self._from_value(self.value - other.value)
+
+    def _fast_le(self, other: Self) -> bool:
+        """Return self<=other, i.e. whether the items of self are contained in the items of other"""
+        return self.value <= other.value
 
     @classmethod
     def parse_string_description(cls, value: str) -> PatternValueType:
-        parsed_value = None
-
-        try:
-            parsed_value = eval(value)
-        except Exception as e:
-            pass
+        parsed_value = _parse_literal(value)
 
         if parsed_value is not None and isinstance(parsed_value, Collection):
             return frozenset(parsed_value)
+        if parsed_value is not None and ',' not in value:  # a single value, e.g. a number. No need to split it
+            return frozenset({parsed_value})
 
         is_bounded = value.startswith(('(', '[', '{')) and value.endswith((')', ']', '}'))
         value_iterator = value[1:-1].split(',') if is_bounded else value.split(',')
-        parsed_value = []
-        for v in value_iterator:
-            try:
-                new_v = eval(v)
-            except:
-                new_v = v
-            parsed_value.append(new_v)
-
-        if parsed_value is not None:
-            return frozenset(parsed_value)
-
-        raise ValueError(f'Value {value} cannot be parsed into {cls.__name__} object')
+        return frozenset([_parse_literal(v, default=v) for v in value_iterator])
 
     @classmethod
     def preprocess_value(cls, value: Collection) -> PatternValueType:
         return frozenset(value)
 
     @property
+    @_memoize_atomic_patterns
     def atomic_patterns(self) -> set[Self]:
         """Return the set of all less precise patterns that cannot be obtained by intersection of other patterns"""
-        return {self.__class__({v}) for v in self.value}
+        return {self._from_value(frozenset((v,))) for v in self.value}
 
     @property
     def min_pattern(self) -> Self:
         """Minimal possible pattern, the sole one per Pattern class. `None` if undefined"""
-        return self.__class__(frozenset())
+        return _get_singleton_pattern(self.__class__, 'min_pattern', lambda: self._from_value(frozenset()))
 
 
 class CategorySetPattern(ItemSetPattern):
@@ -78,10 +131,14 @@ class CategorySetPattern(ItemSetPattern):
     Universe: Optional[frozenset] = None  # The set of all possible categories
 
     def __and__(self, other):
-        return self.__class__(self.value | other.value)
+        return self._from_value(self.value | other.value)
 
     def __or__(self, other):
-        return self.__class__(self.value & other.value)
+        return self._from_value(self.value & other.value)
+
+    def _fast_le(self, other: Self) -> bool:
+        """Return self<=other, i.e. whether the categories of self contain the categories of other"""
+        return self.value >= other.value
 
     def __repr__(self) -> str:
         repr_negative = self.Universe is not None and len(self.value) > len(self.Universe) / 2
@@ -94,9 +151,10 @@ class CategorySetPattern(ItemSetPattern):
     def __sub__(self, other):
         if self.min_pattern is not None and self == other:
             return self.min_pattern
-        return self.__class__(self.value)
+        return self._from_value(self.value)
 
     @property
+    @_memoize_atomic_patterns(class_param='Universe')
     def atomic_patterns(self) -> set[Self]:
         assert self.min_pattern is not None,\
             f"Atomic patterns of {self.__class__} class cannot be computed without predefined min_pattern value. " \
@@ -104,19 +162,20 @@ class CategorySetPattern(ItemSetPattern):
             f"explicitly specify the value of min_pattern."
 
         leftout_vals = self.min_pattern.value - self.value
-        return {self.__class__(self.min_pattern.value-{v}) for v in leftout_vals}
+        return {self._from_value(self.min_pattern.value-{v}) for v in leftout_vals}
 
     @property
     def min_pattern(self) -> Optional[Self]:
         """Minimal possible pattern, the sole one per Pattern class. `None` if undefined"""
         if self.Universe is None:
             return None
-        return self.__class__(self.Universe)
+        return _get_singleton_pattern(
+            self.__class__, 'min_pattern', lambda: self.__class__(self.Universe), class_param=self.Universe)
 
     @property
     def max_pattern(self) -> Self:
         """Maximal possible pattern, the sole one per Pattern class. `None` if undefined"""
-        return self.__class__(frozenset())
+        return _get_singleton_pattern(self.__class__, 'max_pattern', lambda: self._from_value(frozenset()))
 
     def __len__(self) -> int:
         """Minimal number of atomic patterns required to generate the pattern
@@ -132,6 +191,9 @@ class IntervalPattern(Pattern):
     # PatternValue semantics: ((lower_bound, is_closed), (upper_bound, is_closed))
     PatternValueType = tuple[tuple[float, bool], tuple[float, bool]]
     BoundsUniverse: list[float] = None
+    # values of BoundsUniverse (as a tuple, so that in-place changes are noticed) and the same values sorted
+    # in ascending order, to snap the bounds via bisection
+    _sorted_bounds_universe: Optional[tuple[tuple[float, ...], list[float]]] = None
 
     @property
     def lower_bound(self) -> float:
@@ -212,12 +274,41 @@ class IntervalPattern(Pattern):
         is_contradictive = (rb < lb) or (lb == rb and not (closed_lb and closed_rb))
         if is_contradictive:
             lb, rb = 0, 0
+        else:  # the contradictive (i.e. maximal) pattern is not an interval, so it has no bounds to snap
+            lb, rb = cls._snap_to_bounds_universe(lb, rb)
+        return (float(lb), bool(closed_lb)), (float(rb), bool(closed_rb))
 
-        if cls.BoundsUniverse is not None:
-            lb = max(b for b in cls.BoundsUniverse if b <= lb) if lb > -math.inf else lb
-            rb = min(b for b in cls.BoundsUniverse if rb <= b) if rb < math.inf else rb
+    @classmethod
+    def _snap_to_bounds_universe(cls, lb: float, rb: float) -> tuple[float, float]:
+        """Widen the bounds `lb` and `rb` to the closest values from BoundsUniverse (if BoundsUniverse is defined)"""
+        if cls.BoundsUniverse is None:
+            return lb, rb
+
+        bounds_universe = cls._get_sorted_bounds_universe()
+        if lb > -math.inf:
+            lb_idx = bisect_right(bounds_universe, lb)
+            if lb_idx == 0:
+                raise ValueError(f'No value in BoundsUniverse is smaller than or equal to the lower bound {lb}')
+            lb = bounds_universe[lb_idx - 1]
+        if rb < math.inf:
+            rb_idx = bisect_left(bounds_universe, rb)
+            if rb_idx == len(bounds_universe):
+                raise ValueError(f'No value in BoundsUniverse is greater than or equal to the upper bound {rb}')
+            rb = bounds_universe[rb_idx]
+        return lb, rb
 
-        return (float(lb), bool(closed_lb)), (float(rb), bool(closed_rb))
+    @classmethod
+    def _get_sorted_bounds_universe(cls) -> list[float]:
+        """Return the values of BoundsUniverse in ascending order. The sorting is only redone when BoundsUniverse changes"""
+        bounds_universe = tuple(cls.BoundsUniverse)
+        if cls._sorted_bounds_universe is None or cls._sorted_bounds_universe[0] != bounds_universe:
+            cls._sorted_bounds_universe = bounds_universe, sorted(bounds_universe)
+        return cls._sorted_bounds_universe[1]
+
+    @classmethod
+    def _from_bounds(cls, lbound: float, closed_lb: bool, ubound: float, closed_ub: bool) -> Self:
+        """Construct a pattern from already preprocessed bounds, laid out as the value of the class"""
+        return cls._from_value(((lbound, closed_lb), (ubound, closed_ub)))
 
     def __and__(self, other: Self) -> Self:
         """Return self & other, i.e. the most precise pattern that is less precise than both self and other"""
@@ -245,8 +336,7 @@ class IntervalPattern(Pattern):
             ubound = self.upper_bound
             closed_ub = self.is_upper_bound_closed or other.is_upper_bound_closed
 
-        new_value = (lbound, closed_lb), (ubound, closed_ub)
-        return self.__class__(new_value)
+        return self._from_bounds(lbound, closed_lb, ubound, closed_ub)
 
     def __or__(self, other: Self) -> Self:
         """Return self | other, i.e. the least precise pattern that is more precise than both self and other"""
@@ -274,11 +364,10 @@ class IntervalPattern(Pattern):
             ubound = self.upper_bound
             closed_ub = self.is_upper_bound_closed and other.is_upper_bound_closed
 
-        new_value = (lbound, closed_lb), (ubound, closed_ub)
         if (lbound > ubound) \
                 or (lbound == ubound and not (closed_lb and closed_ub)):
             return self.max_pattern
-        return self.__class__(new_value)
+        return self._from_bounds(lbound, closed_lb, ubound, closed_ub)
 
     def __sub__(self, other: Self) -> Self:
         """Return self - other, i.e. the least precise pattern s.t. (self-other)|other == self"""
@@ -299,6 +388,7 @@ class IntervalPattern(Pattern):
         return self.__class__(self.value)
 
     @property
+    @_memoize_atomic_patterns(class_param='BoundsUniverse')
     def atomic_patterns(self) -> set[Self]:
         """Return the set of all less precise patterns that cannot be obtained by intersection of other patterns"""
         if self.value == self.max_pattern.value:
@@ -319,12 +409,15 @@ class IntervalPattern(Pattern):
     @property
     def min_pattern(self) -> Self:
         """Minimal possible pattern, the sole one per Pattern class. `None` if undefined"""
-        return self.__class__(((-math.inf, True), (math.inf, True)))
+        return _get_singleton_pattern(
+            self.__class__, 'min_pattern', lambda: self.__class__(((-math.inf, True), (math.inf, True))),
+            class_param=self.BoundsUniverse)
 
     @property
     def max_pattern(self) -> Self:
         """Minimal possible pattern, the sole one per Pattern class. `None` if undefined"""
-        return self.__class__("ø")
+        return _get_singleton_pattern(
+            self.__class__, 'max_pattern', lambda: self.__class__("ø"), class_param=self.BoundsUniverse)
 
     @property
     def maximal_atoms(self) -> Optional[set[Self]]:
@@ -363,7 +456,13 @@ class ClosedIntervalPattern(IntervalPattern):
     @classmethod
     def preprocess_value(cls, value) -> PatternValueType:
         if isinstance(value, Sequence) and len(value) == 2 and all(isinstance(v, Number) for v in value):
-            return float(value[0]), float(value[1])
+            lb, rb = value
+            # (0, 0) stands for the contradictive (i.e. maximal) pattern 'ø', whose bounds are not snapped
+            is_contradictive = (rb < lb) or (lb == rb == 0)
+            if is_contradictive:
+                return 0.0, 0.0
+            lb, rb = cls._snap_to_bounds_universe(lb, rb)
+            return float(lb), float(rb)
 
         try:
             processed_value = super(ClosedIntervalPattern, cls).preprocess_value(value)
@@ -373,10 +472,16 @@ class ClosedIntervalPattern(IntervalPattern):
 
         raise ValueError(f'Value {value} cannot be preprocessed into {cls.__name__}')
 
+    @classmethod
+    def _from_bounds(cls, lbound: float, closed_lb: bool, ubound: float, closed_ub: bool) -> Self:
+        return cls._from_value((lbound, ubound))
+
 
 class NgramSetPattern(Pattern):
     PatternValueType = frozenset[tuple[str, ...]]
     StopWords: set[str] = frozenset()
+    _lists_less_precise_atoms = True
+    _automaton: Optional[SubNgramAutomaton] = None  # automaton of all sub-ngrams of the value, built on demand
 
     def __repr__(self) -> str:
         ngrams = sorted(self.value, key=lambda ngram: (-len(ngram), ngram))
@@ -415,73 +520,46 @@ class NgramSetPattern(Pattern):
 
     def __and__(self, other: Self) -> Self:
         """Return self & other, i.e. the most precise pattern that is less precise than both self and other"""
-        common_ngrams: list[tuple[str, ...]] = []
-        for ngram_a in self.value:
-            words_pos_a = dict()
-            for i, word in enumerate(ngram_a):
-                words_pos_a[word] = words_pos_a.get(word, []) + [i]
-
-            for ngram_b in other.value:
-                if ngram_a == ngram_b:
-                    common_ngrams.append(ngram_a)
-                    continue
-
-                for j, word in enumerate(ngram_b):
-                    if word not in words_pos_a:
-                        continue
-                    # word in words_a
-                    for i in words_pos_a[word]:
-                        ngram_size = next(
-                            s for s in range(len(ngram_b)+1)
-                            if i+s >= len(ngram_a) or j+s >= len(ngram_b) or ngram_a[i+s] != ngram_b[j+s]
-                        )
-
-                        common_ngrams.append(ngram_a[i:i+ngram_size])
+        common_ngrams = set(iter_common_ngrams(self.value, other.value))
 
         # Delete common n-grams contained in other common n-grams
-        common_ngrams = sorted(common_ngrams, key=lambda ngram: len(ngram), reverse=True)
-        for i in range(len(common_ngrams)):
-            n_ngrams = len(common_ngrams)
-            if i == n_ngrams:
-                break
-
-            ngram = common_ngrams[i]
-            ngrams_to_pop = (j for j in reversed(range(i + 1, n_ngrams))
-                             if self._issubngram(common_ngrams[j], ngram))
-            for j in ngrams_to_pop:
-                common_ngrams.pop(j)
-
-        return self.__class__(frozenset(common_ngrams))
+        return self.__class__(self.filter_max_ngrams(common_ngrams))
 
     def __or__(self, other: Self) -> Self:
         """Return self | other, i.e. the least precise pattern that is more precise than both self and other"""
-        return self.__class__(self.filter_max_ngrams(self.value | other.value))
+        return self._from_value(self.filter_max_ngrams(self.value | other.value))
 
     def __sub__(self, other: Self) -> Self:
         """Return self - other, i.e. the least precise pattern s.t. (self-other)|other == self"""
         if self == other:
             return self.min_pattern
 
-        return self.__class__(self.filter_max_ngrams(self.value - other.value))
+        return self._from_value(self.filter_max_ngrams(self.value - other.value))
+
+    def _fast_le(self, other: Self) -> bool:
+        """Return self<=other, i.e. whether every ngram of self is contained in some ngram of other"""
+        if other._automaton is None:
+            other._automaton = SubNgramAutomaton()
+            for ngram in other.value:
+                other._automaton.add(ngram)
+        return all(ngram in other._automaton for ngram in self.value)
 
     @staticmethod
     def _issubngram(ngram_a: tuple[str], ngram_b: tuple[str]):
-        if len(ngram_a) > len(ngram_b):
-            return False
-        return any(ngram_b[i:i + len(ngram_a)] == ngram_a for i in range(len(ngram_b) - len(ngram_a) + 1))
+        return is_subngram(ngram_a, ngram_b)
 
     @classmethod
     def filter_max_ngrams(self, ngrams: PatternValueType) -> PatternValueType:
-        ngrams = sorted(ngrams, key=lambda ngram: len(ngram), reverse=True)
-        i = 0
-        while i < len(ngrams):
-            if any(self._issubngram(ngrams[i], other) for other in ngrams[:i]):
-                ngrams.pop(i)
+        max_ngrams, max_ngrams_automaton = [], SubNgramAutomaton()
+        for ngram in sorted(ngrams, key=lambda ngram: len(ngram), reverse=True):
+            if ngram in max_ngrams_automaton:
                 continue
-            i += 1
-        return frozenset(ngrams)
+            max_ngrams.append(ngram)
+            max_ngrams_automaton.add(ngram)
+        return frozenset(max_ngrams)
 
     @property
+    @_memoize_atomic_patterns
     def atomic_patterns(self) -> set[Self]:
         """Return the set of all less precise patterns that cannot be obtained by intersection of other patterns"""
         atoms = set()
@@ -495,7 +573,7 @@ class NgramSetPattern(Pattern):
     @property
     def min_pattern(self) -> Optional[Self]:
         """Minimal possible pattern, the sole one per Pattern class. `None` if undefined"""
-        return self.__class__([])
+        return _get_singleton_pattern(self.__class__, 'min_pattern', lambda: self.__class__([]))
 
 
 class CartesianPattern(Pattern):
@@ -524,15 +602,31 @@ class CartesianPattern(Pattern):
         keys_order = sorted(value)
         return frozendict({k: value[k] for k in keys_order})
 
+    @classmethod
+    def _from_subpatterns(cls, subpatterns: Iterable[tuple[str, Pattern]]) -> Self:
+        """Construct a pattern from (dimension, subpattern) pairs sorted by dimension, skipping the parsing of `__init__`
+
+        The subpatterns should already be instances of their dimension types, so only the minimal ones are dropped.
+        """
+        value = {}
+        for k, subpattern in subpatterns:
+            min_pattern = subpattern.min_pattern
+            if min_pattern is None or subpattern != min_pattern:
+                value[k] = subpattern
+
+        return cls._from_value(frozendict(value))
+
     def __and__(self, other: Self) -> Self:
-        return self.__class__({k: self.value[k] & other.value[k] for k in set(self.value) & set(other.value)})
+        # values are sorted by dimensions, so the common dimensions are iterated in the sorted order too
+        other_value = other.value
+        return self._from_subpatterns((k, v & other_value[k]) for k, v in self.value.items() if k in other_value)
 
     def __or__(self, other: Self) -> Self:
-        keys_a, keys_b = set(self.value), set(other.value)
-        left_keys, common_keys, right_keys = keys_a-keys_b, keys_a & keys_b, keys_b - keys_a
-        join = {k: self.value[k] | other.value[k] for k in common_keys}
-        join |= {k: self.value[k] for k in left_keys} | {k: other.value[k] for k in right_keys}
-        return self.__class__(join)
+        value_a, value_b = self.value, other.value
+        return self._from_subpatterns(
+            (k, value_a[k] | value_b[k] if k in value_a and k in value_b else value_a.get(k, value_b.get(k)))
+            for k in sorted(value_a.keys() | value_b.keys())
+        )
 
     def __sub__(self, other: Self) -> Self:
         """Return self - other, i.e. the least precise pattern s.t. (self-other)|other == self"""
@@ -543,6 +637,7 @@ class CartesianPattern(Pattern):
 
     @property
     def atomic_patterns(self) -> set[Self]:
+        # not memoized: the atomic patterns of the subpatterns may depend on the parameters of their own classes
         return {self.__class__({k: atom}) for k, pattern in self.value.items() for atom in pattern.atomic_patterns}
 
     def __len__(self) -> int:
@@ -3,8 +3,8 @@ from functools import reduce
 import itertools as itools
 from typing import Iterator, Union, Iterable, Any, Sequence, Literal
 from bitarray import frozenbitarray as fbarray
-from caspailleur.base_functions import isets2bas
 from .abstract_ps import AbstractPS, WrongUpdateParametersModeError
+from paspailleur.algorithms import base_functions as bfuncs
 
 from tqdm.autonotebook import tqdm
 
@@ -28,6 +28,14 @@ class CartesianPS(AbstractPS):
         """Return the least precise pattern, described by both `a` and `b`"""
         return tuple([ps.meet_patterns(a_, b_) for (ps, a_, b_) in zip(self.basic_structures, a, b)])
 
+    def intent(self, data: list[PatternType], indices: Iterable[int] = None) -> PatternType:
+        """Return common pattern of all rows in `data`
+
+        The intent is computed column by column, so that every basic structure joins the values of its own column
+        """
+        rows = [data[i] for i in indices] if indices is not None else data
+        return tuple([ps.intent([row[i] for row in rows]) for i, ps in enumerate(self.basic_structures)])
+
     def is_less_precise(self, a: PatternType, b: PatternType) -> bool:
         """Return True if pattern `a` is less precise than pattern `b`"""
         return all(ps.is_less_precise(a_, b_) for ps, a_, b_ in zip(self.basic_structures, a, b))
@@ -139,7 +147,7 @@ class CartesianPS(AbstractPS):
 
     def passkeys(self, intent: PatternType, data: list[PatternType]) -> list[PatternType]:
         n_objs, n_attrs = len(data), len(self.basic_structures)
-        extent_final = next(isets2bas([self.extent(data, intent)], n_objs))
+        extent_final = fbarray(bfuncs.indices_to_bitarray(self.extent(data, intent), n_objs))
         if extent_final.all():
             return [self.min_pattern]
         total_extent = extent_final | (~extent_final)
@@ -150,7 +158,7 @@ class CartesianPS(AbstractPS):
                 data_per_structure[j].append(v)
 
         extents_per_structure: list[fbarray] = [
-            next(isets2bas([bs.extent(values, coord)], n_objs))
+            fbarray(bfuncs.indices_to_bitarray(bs.extent(values, coord), n_objs))
             for (bs, coord, values) in zip(self.basic_structures, intent, data_per_structure)
         ]
 
@@ -179,7 +187,7 @@ class CartesianPS(AbstractPS):
                         continue
                     visited.add(candidate)
 
-                    extent = next(isets2bas([subps.extent(subdata, candidate)], n_objs))
+                    extent = fbarray(bfuncs.indices_to_bitarray(subps.extent(subdata, candidate), n_objs))
                     if extent == extent_final:
                         new_keys.append(candidate)
                         continue
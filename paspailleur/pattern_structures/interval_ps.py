@@ -2,6 +2,7 @@ from enum import Flag
 from numbers import Number
 from typing import Iterator, Optional, Union, Iterable, Sequence, Literal
 from bitarray import frozenbitarray as fbarray
+from bitarray.util import zeros as bazeros
 from .abstract_ps import AbstractPS, WrongUpdateParametersModeError
 from math import inf, ceil
 
@@ -124,22 +125,32 @@ class IntervalPS(AbstractPS):
         upper_bounds = sorted({ub for _, ub, _ in data}) if self.max_bounds is None else sorted(self.max_bounds)
         min_, max_ = lower_bounds.pop(0), upper_bounds.pop(-1)
 
-        yield (min_, max_, BoundStatus.CLOSED), fbarray([True]*len(data))
+        yield (min_, max_, BoundStatus.CLOSED), fbarray(~bazeros(len(data)))
 
+        # Extents of more precise bounds are nested, so they are computed with a single sweep over sorted objects
+        n_objects = len(data)
+        objects_order = sorted(range(n_objects), key=lambda i: data[i][0])
+        extent, n_dropped = ~bazeros(n_objects), 0
         for lb in lower_bounds:
-            extent = fbarray((lb <= x for x, _, _ in data))
-            if extent.count() < min_support:
+            while n_dropped < n_objects and data[objects_order[n_dropped]][0] < lb:
+                extent[objects_order[n_dropped]] = False
+                n_dropped += 1
+            if n_objects - n_dropped < min_support:
                 break
-            yield (lb, max_, BoundStatus.CLOSED), extent
+            yield (lb, max_, BoundStatus.CLOSED), fbarray(extent)
 
+        objects_order = sorted(range(n_objects), key=lambda i: data[i][1], reverse=True)
+        extent, n_dropped = ~bazeros(n_objects), 0
         for ub in upper_bounds[::-1]:
-            extent = fbarray((x <= ub for _, x, _ in data))
-            if extent.count() < min_support:
+            while n_dropped < n_objects and data[objects_order[n_dropped]][1] > ub:
+                extent[objects_order[n_dropped]] = False
+                n_dropped += 1
+            if n_objects - n_dropped < min_support:
                 break
-            yield (min_, ub, BoundStatus.CLOSED), extent
+            yield (min_, ub, BoundStatus.CLOSED), fbarray(extent)
 
         if min_support == 0:
-            yield self.max_pattern, fbarray([False]*len(data))
+            yield self.max_pattern, fbarray(bazeros(len(data)))
 
     def n_attributes(self, data: list[PatternType], min_support: Union[int, float] = 0, use_tqdm: bool = False)\
             -> int:
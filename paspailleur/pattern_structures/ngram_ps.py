@@ -1,12 +1,14 @@
 from functools import reduce
-from itertools import product, chain
+from itertools import chain
 from math import ceil
 from typing import Iterator, Iterable, Union, Literal
 
 from bitarray import frozenbitarray as fbarray, bitarray
-from bitarray.util import zeros as bazeros
+from bitarray.util import zeros as bazeros, count_and
 
 from .abstract_ps import AbstractPS
+from paspailleur.algorithms import base_functions as bfuncs
+from ._ngram_utils import SubNgramAutomaton, is_subngram, iter_common_ngrams
 
 
 class NgramPS(AbstractPS):
@@ -24,17 +26,19 @@ class NgramPS(AbstractPS):
             data: Iterable[str], separator=' ',
             update_params_mode:  Literal['write', 'append', False] = 'append'
     ) -> Iterator[PatternType]:
+        # Equal ngrams of different texts are represented by the same tuple, so they are compared by identity first
+        interned_ngrams: dict[tuple[str, ...], tuple[str, ...]] = {}
         for text in data:
             if not text:
                 yield set()
                 continue
 
             if isinstance(text, str):
-                pattern = {tuple(text.split(separator))}
+                ngram = tuple(text.split(separator))
+                pattern = (ngram,) if len(ngram) >= self.min_n else ()
             else:
-                pattern = text
-            pattern = {tuple(ngram) for ngram in pattern if len(ngram) >= self.min_n}
-            yield frozenset(pattern)
+                pattern = (tuple(ngram) for ngram in text if len(ngram) >= self.min_n)
+            yield frozenset(interned_ngrams.setdefault(ngram, ngram) for ngram in pattern)
 
     def join_patterns(self, a: PatternType, b: PatternType) -> PatternType:
         """Return the maximal sub-ngrams contained both in `a` and in `b`
@@ -50,43 +54,24 @@ class NgramPS(AbstractPS):
             return a
 
         # Find common ngrams (not necessarily maximal)
-        common_ngrams = []
-        for ngram_a in a:
-            words_pos_a = dict()
-            for i, word in enumerate(ngram_a):
-                words_pos_a[word] = words_pos_a.get(word, []) + [i]
-
-            for ngram_b in b:
-                if ngram_a == ngram_b:
-                    common_ngrams.append(ngram_a)
-                    continue
-
-                for j, word in enumerate(ngram_b):
-                    if word not in words_pos_a:
-                        continue
-                    # word in words_a
-                    for i in words_pos_a[word]:
-                        ngram_size = next(
-                            s for s in range(len(ngram_b)+1)
-                            if i+s >= len(ngram_a) or j+s >= len(ngram_b) or ngram_a[i+s] != ngram_b[j+s]
-                        )
-                        if ngram_size >= self.min_n:
-                            common_ngrams.append(ngram_a[i:i+ngram_size])
+        common_ngrams = set(iter_common_ngrams(a, b, self.min_n))
 
         # Delete common n-grams contained in other common n-grams
-        common_ngrams = sorted(common_ngrams, key=lambda ngram: len(ngram), reverse=True)
-        for i in range(len(common_ngrams)):
-            n_ngrams = len(common_ngrams)
-            if i == n_ngrams:
-                break
+        return self.filter_max_ngrams(common_ngrams)
+
+    def intent(self, data: list[PatternType], indices: Iterable[int] = None) -> PatternType:
+        """Return common pattern of all rows in `data`
 
-            ngram = common_ngrams[i]
-            ngrams_to_pop = (j for j in reversed(range(i + 1, n_ngrams))
-                             if self.is_less_precise({common_ngrams[j]}, {ngram}))
-            for j in ngrams_to_pop:
-                common_ngrams.pop(j)
+        The joins stop as soon as no common ngram is left, since no more ngrams can appear afterwards
+        """
+        iterator = (data[i] for i in indices) if indices is not None else data
 
-        return frozenset(common_ngrams)
+        intent = self.max_pattern
+        for obj_description in iterator:
+            intent = self.join_patterns(intent, obj_description)
+            if not intent:
+                return self.min_pattern
+        return intent
 
     def meet_patterns(self, a: PatternType, b: PatternType) -> PatternType:
         """Return the least precise pattern, described by both `a` and `b`"""
@@ -104,30 +89,11 @@ class NgramPS(AbstractPS):
         if a == self.max_pattern:  # and b != max_pattern
             return False
 
-        for smaller_tuple in a:
-            small_size = len(smaller_tuple)
-            small_words = set(smaller_tuple)
-            for larger_tuple in b:
-                if not (small_words <= set(larger_tuple)):
-                    continue
-
-                if small_size == 1:
-                    break  # inclusion found
-
-                inclusion_found = False
-                for i, word_start in enumerate(larger_tuple[:-small_size+1]):
-                    if word_start != smaller_tuple[0]:
-                        continue
-
-                    inclusion_found = all(word_a == word_b for word_a, word_b in zip(smaller_tuple, larger_tuple[i:]))
-                    if inclusion_found:
-                        break
-
-                if inclusion_found:
-                    break
-            else:  # no break, i.e. no inclusion found
-                return False
-        return True
+        # Ngrams of `a` that are contained in `b` as a whole are found by a hash lookup, without scanning `b`
+        return all(
+            smaller_tuple in b or any(is_subngram(smaller_tuple, larger_tuple) for larger_tuple in b)
+            for smaller_tuple in a
+        )
 
     def iter_attributes(self, data: list[PatternType], min_support: Union[int, float] = 0)\
             -> Iterator[tuple[PatternType, fbarray]]:
@@ -145,63 +111,55 @@ class NgramPS(AbstractPS):
 
         def compute_words_extents(ptrns):
             n_patterns = len(ptrns)
-            words_extents: dict[str, bitarray] = {}
+            words_objects: dict[str, list[int]] = {}
             for i, pattern in enumerate(ptrns):
                 words = {word for ngram in pattern for word in ngram}
                 for word in words:
-                    if word not in words_extents:
-                        words_extents[word] = bazeros(n_patterns)
-                    words_extents[word][i] = True
-            return words_extents
+                    words_objects.setdefault(word, []).append(i)
+
+            return {word: bfuncs.indices_to_bitarray(objects, n_patterns) for word, objects in words_objects.items()}
 
         def drop_rare_words(words_exts, min_supp):
             rare_words = [w for w, ext in words_exts.items() if ext.count() < min_supp]
             for rare_word in rare_words:
                 del words_exts[rare_word]
 
-        def setup_search_space(prev_lvl_ngrams, n_words_):
-            if n_words_ <= len(prev_lvl_ngrams):
-                for prev_ngrm, word_i in product(prev_lvl_ngrams, range(n_words_)):
-                    if prev_ngrm[1:] + (word_i,) in prev_lvl_ngrams:
-                        yield prev_ngrm, word_i
-                return
-
-            # len(prev_level_ngrams) < n_words:
+        def setup_search_space(prev_lvl_ngrams):
+            # Ngrams of the previous level are sorted lexicographically,
+            # so the last words of every prefix are listed in ascending order
             prefixes_dict: dict[tuple[int, ...], list[int]] = {}
             for prev_ngrm in prev_lvl_ngrams:
-                prefix, word_i = prev_ngrm[:-1], prev_ngrm[-1]
-                if prefix not in prefixes_dict:
-                    prefixes_dict[prefix] = []
-                prefixes_dict[prefix].append(word_i)
+                prefixes_dict.setdefault(prev_ngrm[:-1], []).append(prev_ngrm[-1])
 
             for prev_ngrm in prev_lvl_ngrams:
-                if prev_ngrm[1:] not in prefixes_dict:
-                    continue
-
-                for word_i in prefixes_dict[prev_ngrm[1:]]:
+                for word_i in prefixes_dict.get(prev_ngrm[1:], ()):
                     yield prev_ngrm, word_i
 
-        def refine_extent(ext, ngram_verb, min_supp, ptrns):
-            supp_delta = ext.count() - max(min_supp, 1)
-            # the use of str `words` is important because of the way is_less_precise function works
-            for ptrn_i in ext.search(True):
-                if self.is_less_precise({ngram_verb}, ptrns[ptrn_i]):
-                    continue
-                # new_ngram is not contained in i-th pattern
-                ext[ptrn_i] = False
-                supp_delta -= 1
-                if supp_delta < 0:
-                    break
-            else:  # no break, i.e. new_ext.count() >= min_supp
-                return ext
-            return None
+        def compute_ngrams_extents(ngrams_, ptrns):
+            """Compute the exact extents of same-sized `ngrams_` with a single pass over `ptrns`"""
+            # `ngrams_` and `ptrns` should be given in the same encoding (i.e. both as words' ids)
+            if not ngrams_:
+                return {}
+            size = len(next(iter(ngrams_)))
+
+            ngrams_objects: dict[tuple[int, ...], list[int]] = {}
+            for i, pattern in enumerate(ptrns):
+                subngrams = {ngram[j:j+size] for ngram in pattern for j in range(len(ngram)-size+1)}
+                for ngram in subngrams & ngrams_:
+                    ngrams_objects.setdefault(ngram, []).append(i)
+
+            return {ngram: bfuncs.indices_to_bitarray(objects, len(ptrns)) for ngram, objects in ngrams_objects.items()}
 
         yield frozenset(), fbarray(~bazeros(len(data)))
 
         words_extents = compute_words_extents(data)
         drop_rare_words(words_extents, min_support)
         words, extents = zip(*words_extents.items())
-        n_words = len(words)
+
+        # Encode words with their indices to compare ngrams of integers and not of strings (rare words are dropped)
+        words_ids = {word: word_i for word_i, word in enumerate(words)}
+        data_ids = [frozenset(tuple(words_ids.get(word, -1) for word in ngram) for ngram in pattern)
+                    for pattern in data]
 
         # Yield 1grams
         ngrams = {(word_i,): ext for word_i, ext in enumerate(extents)}
@@ -212,19 +170,19 @@ class NgramPS(AbstractPS):
         while ngrams:
             prev_ngrams, ngrams = ngrams, {}
 
-            #search_space = setup_search_space(prev_ngrams, n_words)
-            search_space = list(setup_search_space(prev_ngrams, n_words))
+            # Keep the new ngrams whose approximate extent (which is a superset of the exact extent) is big enough
+            search_space = [
+                (prev_ngram, word_i) for prev_ngram, word_i in setup_search_space(prev_ngrams)
+                if count_and(prev_ngrams[prev_ngram], prev_ngrams[prev_ngram[1:] + (word_i,)]) >= max(min_support, 1)
+            ]
+
+            # Get the exact extents of all the new ngrams at once
+            new_ngrams = {prev_ngram + (word_i,) for prev_ngram, word_i in search_space}
+            new_extents = compute_ngrams_extents(new_ngrams, data_ids)
             for prev_ngram, word_i in search_space:
-                # Get the approximate extent of the new ngram (which is a superset of the exact extent)
                 new_ngram: tuple[int, ...] = prev_ngram + (word_i,)
-                proto_extent = prev_ngrams[prev_ngram] & prev_ngrams[new_ngram[1:]]
-                if not proto_extent.any() or proto_extent.count() < min_support:
-                    continue
-
-                # Get the exact extent of the new ngram
-                new_ngram_verb = tuple([words[word_j] for word_j in new_ngram])
-                new_extent = refine_extent(proto_extent, new_ngram_verb, min_support, data)
-                if new_extent is None:
+                new_extent = new_extents.get(new_ngram)
+                if new_extent is None or new_extent.count() < max(min_support, 1):
                     continue
 
                 # Yield the new ngram if its extent is new.
@@ -232,7 +190,7 @@ class NgramPS(AbstractPS):
                 ngrams[new_ngram] = new_extent
                 if new_extent != extents[word_i] and new_extent != prev_ngrams[prev_ngram]\
                         and len(new_ngram) >= self.min_n:
-                    yield new_ngram_verb, fbarray(new_extent)
+                    yield tuple([words[word_j] for word_j in new_ngram]), fbarray(new_extent)
 
         if min_support == 0:
             yield None, fbarray(bazeros(len(data)))
@@ -291,15 +249,13 @@ class NgramPS(AbstractPS):
                     yield next_descr
 
     def filter_max_ngrams(self, description: PatternType) -> PatternType:
-        description = sorted(description, key=lambda ngram: len(ngram), reverse=True)
-        i = 0
-        while i < len(description):
-            cur_ngram = ' '.join(description[i])
-            if any(cur_ngram in ' '.join(ngram) for ngram in description[:i]):
-                description.pop(i)
+        max_ngrams, max_ngrams_automaton = [], SubNgramAutomaton()
+        for ngram in sorted(description, key=lambda ngram: len(ngram), reverse=True):
+            if ngram in max_ngrams_automaton:
                 continue
-            i += 1
-        return frozenset(description)
+            max_ngrams.append(ngram)
+            max_ngrams_automaton.add(ngram)
+        return frozenset(max_ngrams)
 
 
 if __name__ == '__main__':
@@ -1,4 +1,4 @@
-from functools import reduce
+from functools import reduce, lru_cache
 from typing import Iterator, Iterable, Optional
 
 from .set_ps import ConjunctiveSetPS
@@ -8,6 +8,40 @@ import nltk
 from nltk.corpus import wordnet
 
 
+@lru_cache(maxsize=None)
+def _ensure_wordnet():
+    """Download WordNet corpus only if it cannot be loaded locally. Memoized, so the check runs once per session"""
+    try:
+        wordnet.ensure_loaded()
+    except LookupError:
+        nltk.download('wordnet', quiet=True)
+
+
+@lru_cache(maxsize=None)
+def _synonyms(word: str, n_synonyms: Optional[int]) -> frozenset[str]:
+    """Return (at most `n_synonyms`) synonyms of `word`. Memoized, since WordNet lookups are slow"""
+    synonyms = set()
+    for synset in wordnet.synsets(word):
+        for lemma in synset.lemmas():
+            synonyms.add(lemma.name())
+            if n_synonyms is not None and len(synonyms) >= n_synonyms:
+                return frozenset(synonyms)
+    return frozenset(synonyms)
+
+
+@lru_cache(maxsize=None)
+def _antonyms(word: str, n_antonyms: Optional[int]) -> frozenset[str]:
+    """Return (at most `n_antonyms`) antonyms of `word`. Memoized, since WordNet lookups are slow"""
+    antonyms = set()
+    for synset in wordnet.synsets(word):
+        for lemma in synset.lemmas():
+            if lemma.antonyms():
+                antonyms.add(lemma.antonyms()[0].name())
+                if n_antonyms is not None and len(antonyms) >= n_antonyms:
+                    return frozenset(antonyms)
+    return frozenset(antonyms)
+
+
 class SynonymPS(ConjunctiveSetPS):
     PatternType = frozenset[str]  # Every text is described by a set of synonyms to words in the text
     n_synonyms: int | None = 1  # number of synonyms for a word
@@ -15,17 +49,11 @@ class SynonymPS(ConjunctiveSetPS):
     max_pattern = frozenset({'<MAX_SYNONYM'})  # Maximal pattern that should be more precise than any other pattern
 
     def __init__(self, n_synonyms: int | None = 1):
-        nltk.download('wordnet')
+        _ensure_wordnet()
         self.n_synonyms = n_synonyms
 
     def get_synonyms(self, word: str) -> set[str]:
-        synonyms = set()
-        for synset in wordnet.synsets(word):
-            for lemma in synset.lemmas():
-                synonyms.add(lemma.name())
-                if self.n_synonyms is not None and len(synonyms) >= self.n_synonyms:
-                    return synonyms
-        return synonyms
+        return set(_synonyms(word, self.n_synonyms))
 
     def preprocess_data(self, data: Iterable[str], separator=' ') -> Iterator[PatternType]:
         for text in data:
@@ -41,18 +69,11 @@ class AntonymPS(ConjunctiveSetPS):
     max_pattern = frozenset({'<MAX_ANTONYM'})  # Maximal pattern that should be more precise than any other pattern
     
     def __init__(self, n_antonyms: int = 1):
-        nltk.download('wordnet')
+        _ensure_wordnet()
         self.n_antonyms = n_antonyms
 
     def get_antonyms(self, word: str) -> PatternType:
-        antonyms = set()
-        for synset in wordnet.synsets(word):
-            for lemma in synset.lemmas():
-                if lemma.antonyms():
-                    antonyms.add(lemma.antonyms()[0].name())
-                    if self.n_antonyms is not None and len(antonyms) >= self.n_antonyms:
-                        return frozenset(antonyms)
-        return frozenset(antonyms)
+        return _antonyms(word, self.n_antonyms)
 
     def preprocess_data(self, data: Iterable[str], separator=' ') -> Iterator[PatternType]:
         for text in data:
@@ -1,8 +1,14 @@
-from typing import TypeVar, Self, Optional
+from typing import TypeVar, Self, Optional, Union
+
+from bitarray import bitarray
+from bitarray.util import subset as basubset
 
 
 class Pattern:
     PatternValueType = TypeVar('PatternValueType')
+    _hash: Optional[int] = None  # hash of the pattern's value, computed on the first call of __hash__
+    # whether `atomic_patterns` of a pattern list all the nontrivial atomic patterns less precise than the pattern
+    _lists_less_precise_atoms: bool = False
 
     def __init__(self, value: PatternValueType):
         if isinstance(value, str):
@@ -14,6 +20,13 @@ class Pattern:
 
         self._value = self.preprocess_value(value)  # if not isinstance(value, self.__class__) else value.value
 
+    @classmethod
+    def _from_value(cls, value: PatternValueType) -> Self:
+        """Construct a pattern from a preprocessed value, skipping the parsing and preprocessing of `__init__`"""
+        pattern = cls.__new__(cls)
+        pattern._value = value
+        return pattern
+
     @property
     def value(self) -> PatternValueType:
         return self._value
@@ -88,12 +101,13 @@ class Pattern:
 
     def __len__(self) -> int:
         """Minimal number of atomic patterns required to generate the pattern"""
-        if self.min_pattern is not None and self == self.min_pattern:
+        min_pattern = self.min_pattern
+        if min_pattern is not None and self == min_pattern:
             return 0
 
+        # count the maximal atoms. `>` is strict, so no atom has to be excluded from the comparison with itself
         atoms = self.atomic_patterns
-        atoms = {atom for atom in self.atomic_patterns if not any(other > atom for other in atoms - {atom})}
-        return len(atoms)
+        return sum(1 for atom in atoms if not any(other > atom for other in atoms))
 
     @classmethod
     def parse_string_description(cls, value: str) -> PatternValueType:
@@ -105,10 +119,22 @@ class Pattern:
 
     def __eq__(self, other: Self) -> bool:
         """Return self==other"""
+        if self is other:
+            return True
+        # equal values have equal hashes, so the patterns differ if both (already computed) hashes differ
+        if self._hash is not None and other._hash is not None and self._hash != other._hash:
+            return False
         return self.value == other.value
 
     def __le__(self, other: Self) -> bool:
         """Return self<=other, i.e. whether self is less precise or equal to other"""
+        if self is other:
+            return True
+
+        is_less_precise = self._fast_le(other)
+        if is_less_precise is not NotImplemented:
+            return is_less_precise
+
         if self == other:
             return True
 
@@ -116,8 +142,27 @@ class Pattern:
 
     def __lt__(self, other: Self) -> bool:
         """Return self<other, i.e. whether self is less precise than other"""
+        if self is other:
+            return False
+
+        is_less_precise = self._fast_le(other)
+        if is_less_precise is not NotImplemented:
+            return is_less_precise and self != other
+
         return (self != other) and (self & other == self)
 
+    def _fast_le(self, other: Self) -> Union[bool, type(NotImplemented)]:
+        """Return self<=other computed directly from the values, or NotImplemented to compare via self & other"""
+        if self.__class__.__and__ is not Pattern.__and__:
+            return NotImplemented
+
+        # for sets and bitarrays, `self & other == self` means that the value of `self` is a subset of other's value
+        if isinstance(self.value, bitarray) and isinstance(other.value, bitarray):
+            return basubset(self.value, other.value)
+        if isinstance(self.value, (set, frozenset)) and isinstance(other.value, (set, frozenset)):
+            return self.value <= other.value
+        return NotImplemented
+
     def intersection(self, other: Self) -> Self:
         """Return self & other, i.e. the most precise pattern that is less precise than both self and other"""
         return self & other
@@ -147,7 +192,9 @@ class Pattern:
         return self >= other
 
     def __hash__(self):
-        return hash(self.value)
+        if self._hash is None:
+            self._hash = hash(self.value)
+        return self._hash
 
     @property
     def atomic_patterns(self) -> set[Self]:
@@ -4,7 +4,7 @@ from functools import reduce
 from operator import itemgetter
 from typing import Type, TypeVar, Union, Collection, Optional, Iterator, Generator, Literal, Iterable, Sized
 from bitarray import bitarray, frozenbitarray as fbarray
-from bitarray.util import zeros as bazeros
+from bitarray.util import zeros as bazeros, subset as basubset, any_and
 
 from caspailleur.io import to_absolute_number
 from caspailleur.order import sort_intents_inclusion, inverse_order
@@ -17,26 +17,59 @@ from paspailleur.algorithms import base_functions as bfuncs, mine_equivalence_cl
 
 class PatternStructure:
     PatternType = TypeVar('PatternType', bound=Pattern)
+    _cache_maxsize: int = 4096  # the number of recently computed extents (and intents) to memoize
 
     def __init__(self, pattern_type: Type[Pattern] = Pattern):
         self.PatternType = pattern_type
         # patterns introduced by objects, related to what exact objects they introduce
         self._object_irreducibles: Optional[dict[pattern_type, fbarray]] = None
         self._object_names: Optional[list[str]] = None
+        self._object_names_idxs: Optional[dict[str, int]] = None  # index of every object name in `_object_names`
+        # object-irreducible pattern of every object (in the order of `_object_names`), to access patterns by objects
+        self._objects_patterns: Optional[list[pattern_type]] = None
         # smallest nontrivial patterns, related to what objects they describe
         self._atomic_patterns: Optional[OrderedDict[pattern_type, fbarray]] = None
         # list of indices of greater atomic patterns per every atomic pattern
         self._atomic_patterns_order: Optional[list[fbarray]] = None
+        # minimal support of the computed atomic patterns: less frequent atomic patterns are not listed
+        self._atomic_patterns_min_support: Optional[int] = None
+        # atomic patterns (in the order of `_atomic_patterns`) that describe every object, i.e. the incidence matrix
+        self._objects_atomic_patterns: Optional[list[fbarray]] = None
+        # keys of `_atomic_patterns` to access them by index (iterating an OrderedDict calls __hash__ for every key)
+        self._atomic_patterns_list: Optional[tuple[pattern_type, ...]] = None
+        # memoized minimal and maximal patterns of the data. Should be reset whenever the data changes
+        self._min_pattern_cache: Optional[pattern_type] = None
+        self._max_pattern_cache: Optional[pattern_type] = None
+        # memoized extents of recently queried patterns. Should be cleared whenever the data changes
+        self._extents_cache: OrderedDict[pattern_type, fbarray] = OrderedDict()
+        # memoized intents of recently queried sets of objects. Should be cleared whenever the data changes
+        self._intents_cache: OrderedDict[fbarray, pattern_type] = OrderedDict()
 
     def extent(self, pattern: PatternType, return_bitarray: bool = False) -> Union[set[str], fbarray]:
         if not self._object_irreducibles or not self._object_names:
             raise ValueError('The data is unknown. Fit the PatternStructure to your data using .fit(...) method')
 
-        extent = bfuncs.extension(pattern, self._object_irreducibles)
+        extent = self._lookup_cache(self._extents_cache, pattern, self._compute_extent)
 
         if return_bitarray:
-            return fbarray(extent)
-        return {self._object_names[g] for g in extent.search(True)}
+            return extent
+        return self.verbalise_extent(extent)
+
+    def _lookup_cache(self, cache: OrderedDict, key, compute_func):
+        """Return the value of `key` memoized in `cache`, or compute it with `compute_func` and memoize it"""
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        value = cache[key] = compute_func(key)
+        if len(cache) > self._cache_maxsize:
+            cache.popitem(last=False)
+        return value
+
+    def _compute_extent(self, pattern: PatternType) -> fbarray:
+        # extents of atomic patterns are already computed in `init_atomic_patterns`
+        if self._atomic_patterns is not None and pattern in self._atomic_patterns:
+            return self._atomic_patterns[pattern]
+        return fbarray(bfuncs.extension(pattern, self._object_irreducibles))
 
     def intent(self, objects: Union[Collection[str], fbarray]) -> PatternType:
         if not self._object_irreducibles or not self._object_names:
@@ -45,10 +78,48 @@ class PatternStructure:
         objects_ba = objects
         if not isinstance(objects_ba, bitarray):
             objects_ba = bazeros(len(self._object_names))
-            for object_name in objects:
-                objects_ba[self._object_names.index(object_name)] = True
-
-        return bfuncs.intention(objects_ba, self._object_irreducibles)
+            objects_ba[[self._object_names_idxs[object_name] for object_name in objects]] = True
+        # the set of objects is hashed to look up its intent
+        return self._lookup_cache(self._intents_cache, fbarray(objects_ba), self._compute_intent)
+
+    def _compute_intent(self, objects_ba: fbarray) -> PatternType:
+        # Vertical format pays off as soon as there are several objects' patterns to meet
+        n_objects = objects_ba.count()
+        use_atomic_patterns = self._atomic_patterns is not None \
+            and 1 < n_objects and self._atomic_patterns_min_support <= n_objects
+        if use_atomic_patterns:
+            return self._intent_via_atomic_patterns(objects_ba)
+        if not n_objects:
+            return bfuncs.intention(objects_ba, self._object_irreducibles)
+
+        # Every object has exactly one object-irreducible pattern.
+        # So the patterns to meet are looked up by the objects, with no scan over all object-irreducible patterns
+        super_patterns = list(dict.fromkeys(map(self._objects_patterns.__getitem__, objects_ba.search(True))))
+        first_pattern = super_patterns[0]
+        return reduce(first_pattern.__class__.__and__, super_patterns, first_pattern)
+
+    def _intent_via_atomic_patterns(self, objects: bitarray) -> PatternType:
+        """Compute the intent as the join of all atomic patterns that describe every object in `objects`
+
+        The common atomic patterns are found by intersecting the objects' rows in the object-atom incidence matrix,
+        so only the maximal ones among the found atomic patterns are joined as Patterns.
+        """
+        atomic_patterns = self._atomic_patterns_list
+        objects_idxs = objects.search(True)
+        common_atoms = bitarray(self._objects_atomic_patterns[next(objects_idxs)])
+        for object_idx in objects_idxs:
+            common_atoms &= self._objects_atomic_patterns[object_idx]
+
+        max_common_atoms = (atomic_patterns[i] for i in common_atoms.search(True)
+                            if not any_and(self._atomic_patterns_order[i], common_atoms))
+        min_pattern = self.min_pattern
+        return reduce(min_pattern.__class__.__or__, max_common_atoms, min_pattern)
+
+    def __getstate__(self):
+        # the memoized results are not worth copying, they are recomputed on demand
+        state = self.__dict__.copy()
+        state['_extents_cache'], state['_intents_cache'] = OrderedDict(), OrderedDict()
+        return state
 
     def fit(
             self,
@@ -57,14 +128,26 @@ class PatternStructure:
             use_tqdm: bool = True
     ):
         object_names, objects_patterns = zip(*object_descriptions.items())
+        self._extents_cache.clear()
+        self._intents_cache.clear()
+        self._min_pattern_cache, self._max_pattern_cache = None, None
         object_irreducibles = bfuncs.group_objects_by_patterns(objects_patterns)
 
         self._object_names = list(object_names)
+        self._object_names_idxs = {name: idx for idx, name in enumerate(self._object_names)}
         self._object_irreducibles = {k: fbarray(v) for k, v in object_irreducibles.items()}
+        self._objects_patterns = [None] * len(self._object_names)
+        for pattern, objects in self._object_irreducibles.items():
+            for object_idx in objects.search(True):
+                self._objects_patterns[object_idx] = pattern
+        # atomic patterns computed for the previous data (if any) are outdated
+        self._atomic_patterns, self._atomic_patterns_order = None, None
+        self._atomic_patterns_min_support, self._objects_atomic_patterns = None, None
+        self._atomic_patterns_list = None
 
         if compute_atomic_patterns is None:
             # Set to True if the values can be computed
-            pattern = list(object_irreducibles)[0]
+            pattern = next(iter(object_irreducibles))
             try:
                 _ = pattern.atomic_patterns
                 compute_atomic_patterns = True
@@ -77,18 +160,21 @@ class PatternStructure:
     def min_pattern(self) -> PatternType:
         if not self._object_irreducibles:
             raise ValueError('The data is unknown. Fit the PatternStructure to your data using .fit(...) method')
-        return bfuncs.minimal_pattern(self._object_irreducibles)
+        if self._min_pattern_cache is None:
+            self._min_pattern_cache = bfuncs.minimal_pattern(self._object_irreducibles)
+        return self._min_pattern_cache
 
     @property
     def max_pattern(self) -> PatternType:
         if not self._object_irreducibles:
             raise ValueError('The data is unknown. Fit the PatternStructure to your data using .fit(...) method')
-
-        return bfuncs.maximal_pattern(self._object_irreducibles)
+        if self._max_pattern_cache is None:
+            self._max_pattern_cache = bfuncs.maximal_pattern(self._object_irreducibles)
+        return self._max_pattern_cache
 
     @property
     def max_atoms(self) -> set[PatternType]:
-        some_pattern = next(p for p in self._object_irreducibles)
+        some_pattern = next(iter(self._object_irreducibles))
         max_atoms = some_pattern.maximal_atoms
         if max_atoms is None:
             return set()
@@ -98,7 +184,29 @@ class PatternStructure:
         """Compute the set of all patterns that cannot be obtained by intersection of other patterns"""
         min_support = to_absolute_number(min_support, len(self._object_names))
 
-        atomic_patterns = reduce(set.__or__, (p.atomic_patterns for p in self._object_irreducibles), set())
+        # Some patterns (e.g. itemsets) list all the nontrivial atomic patterns less precise than them.
+        # So the extents of their atomic patterns are delivered by the objects, with no comparison of patterns.
+        # The minimal pattern (e.g. an ngram of stop words) is less precise than every pattern, so it is not delivered
+        some_pattern = next(iter(self._object_irreducibles))
+        delivers_extents = some_pattern._lists_less_precise_atoms
+        min_pattern = some_pattern.min_pattern
+        delivered_extents: dict[Pattern, bitarray] = {}
+
+        # Objects with equal descriptions share one object-irreducible pattern, so every description is decomposed once.
+        # The atomic patterns are gathered in one set, without copying the partial unions
+        atomic_patterns = set()
+        for pattern, objects in self._object_irreducibles.items():
+            pattern_atoms = pattern.atomic_patterns
+            atomic_patterns |= pattern_atoms
+            if not delivers_extents:
+                continue
+            for atomic_pattern in pattern_atoms:
+                if atomic_pattern == min_pattern:
+                    continue
+                if atomic_pattern in delivered_extents:
+                    delivered_extents[atomic_pattern] |= objects
+                else:
+                    delivered_extents[atomic_pattern] = bitarray(objects)
         atomic_patterns |= self.max_atoms
 
         # Step 1. Group patterns by their extents. For every extent, list patterns in topological sorting
@@ -106,7 +214,10 @@ class PatternStructure:
         patterns_iterator = tqdm(atomic_patterns, disable=not use_tqdm, desc='Compute atomic extents',
                                  total=len(atomic_patterns))
         for atomic_pattern in patterns_iterator:
-            extent: fbarray = self.extent(atomic_pattern, return_bitarray=True)
+            if atomic_pattern in delivered_extents:
+                extent = fbarray(delivered_extents[atomic_pattern])
+            else:
+                extent = self.extent(atomic_pattern, return_bitarray=True)
             if extent.count() < min_support:
                 continue
 
@@ -137,8 +248,6 @@ class PatternStructure:
             return extents_subsumption_order
 
         sorted_extents = sorted(patterns_per_extent, key=lambda ext: (-ext.count(), tuple(ext.search(True))))
-        extents_order = sort_extents_subsumption(sorted_extents)
-        extents_to_idx_map = {extent: idx for idx, extent in enumerate(sorted_extents)}
 
         atomic_patterns, atomic_extents = zip(*[(ptrn, ext) for ext in sorted_extents for ptrn in patterns_per_extent[ext]])
         pattern_to_idx_map = {pattern: idx for idx, pattern in enumerate(atomic_patterns)}
@@ -146,39 +255,69 @@ class PatternStructure:
 
         # patterns pointing to the bitarray of indices of next greater patterns
         patterns_order: list[bitarray] = [None for _ in range(n_patterns)]
-        patterns_iterator = tqdm(reversed(atomic_patterns), disable=not use_tqdm, desc='Compute order of atoms',
-                                 total=len(atomic_patterns))
-        for pattern in patterns_iterator:
-            idx = pattern_to_idx_map[pattern]
-            extent = atomic_extents[idx]
-            extent_idx = extents_to_idx_map[extent]
-
-            # select patterns that might be greater than the current one
-            patterns_to_test = bazeros(n_patterns)
-            n_greater_patterns_same_extent = len(patterns_per_extent[extent]) - patterns_per_extent[extent].index(pattern)-1
-            patterns_to_test[idx+1:idx+n_greater_patterns_same_extent+1] = True
-            for smaller_extent_idx in extents_order[extent_idx].search(True):
-                other_extent = sorted_extents[smaller_extent_idx]
-                first_other_pattern_idx = pattern_to_idx_map[patterns_per_extent[other_extent][0]]
-                n_patterns_other_extent = len(patterns_per_extent[other_extent])
-                patterns_to_test[first_other_pattern_idx:first_other_pattern_idx+n_patterns_other_extent] = True
-
-            # find patterns that are greater than the current one
-            super_patterns = bazeros(n_patterns)
-            while patterns_to_test.any():
-                other_idx = patterns_to_test.find(True)
-                patterns_to_test[other_idx] = False
-
-                other = atomic_patterns[other_idx]
-                if pattern < other:
-                    super_patterns[other_idx] = True
-                    super_patterns |= patterns_order[other_idx]
-                    patterns_to_test &= ~patterns_order[other_idx]
-            patterns_order[idx] = super_patterns
+        if delivers_extents:
+            # Every atomic pattern lists all the atomic patterns less precise than it (including itself).
+            # So the order is read from the atomic patterns of the atomic patterns, with no comparison of patterns
+            patterns_order = [bazeros(n_patterns) for _ in range(n_patterns)]
+            for idx, pattern in enumerate(atomic_patterns):
+                for smaller_pattern in pattern.atomic_patterns:
+                    smaller_idx = pattern_to_idx_map.get(smaller_pattern, idx)
+                    if smaller_idx != idx:
+                        patterns_order[smaller_idx][idx] = True
+            if min_pattern in pattern_to_idx_map:
+                min_idx = pattern_to_idx_map[min_pattern]
+                patterns_order[min_idx].setall(True)
+                patterns_order[min_idx][min_idx] = False
+        else:
+            extents_order = sort_extents_subsumption(sorted_extents)
+            extents_to_idx_map = {extent: idx for idx, extent in enumerate(sorted_extents)}
+
+            patterns_iterator = tqdm(reversed(atomic_patterns), disable=not use_tqdm, desc='Compute order of atoms',
+                                     total=len(atomic_patterns))
+            patterns_to_test = bazeros(n_patterns)  # the buffer is reused for every pattern
+            for pattern in patterns_iterator:
+                idx = pattern_to_idx_map[pattern]
+                extent = atomic_extents[idx]
+                extent_idx = extents_to_idx_map[extent]
+
+                # select patterns that might be greater than the current one
+                # (patterns of the same extent are listed one after another, starting from the first one)
+                patterns_to_test.setall(False)
+                first_pattern_same_extent_idx = pattern_to_idx_map[patterns_per_extent[extent][0]]
+                n_patterns_same_extent = len(patterns_per_extent[extent])
+                patterns_to_test[idx+1:first_pattern_same_extent_idx+n_patterns_same_extent] = True
+                for smaller_extent_idx in extents_order[extent_idx].search(True):
+                    other_extent = sorted_extents[smaller_extent_idx]
+                    first_other_pattern_idx = pattern_to_idx_map[patterns_per_extent[other_extent][0]]
+                    n_patterns_other_extent = len(patterns_per_extent[other_extent])
+                    patterns_to_test[first_other_pattern_idx:first_other_pattern_idx+n_patterns_other_extent] = True
+
+                # find patterns that are greater than the current one
+                # (patterns already known to be greater by transitivity are skipped,
+                # so `patterns_to_test` is never changed)
+                super_patterns = bazeros(n_patterns)
+                for other_idx in patterns_to_test.search(True):
+                    if super_patterns[other_idx]:
+                        continue
+
+                    other = atomic_patterns[other_idx]
+                    if pattern < other:
+                        super_patterns[other_idx] = True
+                        super_patterns |= patterns_order[other_idx]
+                patterns_order[idx] = super_patterns
 
         atomic_patterns = OrderedDict([(ptrn, ext) for ext in sorted_extents for ptrn in patterns_per_extent[ext]])
         self._atomic_patterns = atomic_patterns
         self._atomic_patterns_order = [fbarray(ba) for ba in patterns_order]
+        self._atomic_patterns_min_support = min_support
+        self._atomic_patterns_list = tuple(atomic_patterns)
+
+        # The atomic patterns of every object form a strided slice of the stack of atomic extents
+        n_objects = len(self._object_names)
+        atomic_extents_stacked = bitarray()
+        for extent in atomic_patterns.values():
+            atomic_extents_stacked += extent
+        self._objects_atomic_patterns = [fbarray(atomic_extents_stacked[g::n_objects]) for g in range(n_objects)]
 
     def iter_atomic_patterns(
         self,
@@ -195,7 +334,7 @@ class PatternStructure:
             if not return_extents:
                 return ptrn
             if not return_bitarrays:
-                return ptrn, {self._object_names[g] for g in ext.search(True)}
+                return ptrn, self.verbalise_extent(ext)
             return ptrn, ext
 
         if kind == 'bruteforce':
@@ -246,29 +385,30 @@ class PatternStructure:
 
         border_pattern_extents = {
             pattern: self.extent(pattern=pattern, return_bitarray=True) for pattern in self._object_irreducibles}
-        premaximals = sorted(
+        sorted_patterns = sorted(
             border_pattern_extents,
             key=lambda pattern: (border_pattern_extents[pattern].count(),
                                  tuple(border_pattern_extents[pattern].search(True))))
         # now smallest patterns at the start, maximals at the end
 
-        i = 0
-        while i < len(premaximals):
-            pattern = premaximals[i]
-            if any(other >= pattern for other in premaximals[:i]):
-                del premaximals[i]
+        # An object-irreducible pattern `a` is less precise than object-irreducible pattern `b`
+        # iff `a` describes the objects of `b`, i.e. iff the extent of `b` is contained in the extent of `a`.
+        # So the premaximal patterns are found by subset checks on extents, with no comparison of patterns
+        premaximal_extents: list[fbarray] = []
+        for pattern in sorted_patterns:
+            extent = border_pattern_extents[pattern]
+            if any(basubset(other_extent, extent) for other_extent in premaximal_extents):
                 continue
             # current pattern is premaximal, i.e. exists no bigger nontrivial pattern
-            i += 1
+            premaximal_extents.append(extent)
 
             if not return_extents:
                 yield pattern
             else:
-                extent = border_pattern_extents[pattern]
                 if return_bitarrays:
                     yield pattern, extent
                 else:
-                    yield pattern, {self._object_names[g] for g in extent.search(True)}
+                    yield pattern, self.verbalise_extent(extent)
 
     @property
     def premaximal_patterns(self) -> dict[PatternType, set[str]]:
@@ -371,7 +511,8 @@ class PatternStructure:
     def verbalise_extent(self, extent: Union[bitarray, set[str]]) -> set[str]:
         if not isinstance(extent, bitarray):
             return extent
-        return {self._object_names[g] for g in extent.search(True)}
+        # the indices of objects are both found and mapped to the names of objects in C
+        return set(map(self._object_names.__getitem__, extent.search(True)))
 
     def iter_keys(
             self,
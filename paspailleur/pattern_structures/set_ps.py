@@ -5,11 +5,11 @@ from math import ceil
 from numbers import Number
 from typing import Iterator, TypeVar, Union, Iterable, Container, Hashable, Literal
 from bitarray import frozenbitarray as fbarray, bitarray
-from bitarray.util import zeros as bazeros
+from bitarray.util import zeros as bazeros, count_and
 from deprecation import deprecated
-from caspailleur.base_functions import isets2bas
 
 from .abstract_ps import AbstractPS, WrongUpdateParametersModeError
+from paspailleur.algorithms import base_functions as bfuncs
 
 from itertools import combinations
 
@@ -83,18 +83,31 @@ class DisjunctiveSetPS(AbstractPS):
         n_objects = len(data)
         empty_extent = fbarray(bazeros(n_objects))
 
-        vals_extents: dict[T, bitarray] = {}
+        vals_objects: dict[T, list[int]] = {}
         for i, pattern in enumerate(data):
             for v in pattern:
-                if v not in vals_extents:
-                    vals_extents[v] = bitarray(empty_extent)
-                vals_extents[v][i] = True
+                vals_objects.setdefault(v, []).append(i)
+
+        vals_extents: dict[T, bitarray] = {
+            v: bfuncs.indices_to_bitarray(objects, n_objects) for v, objects in vals_objects.items()}
+
+        # An object is described by all the values but `value` iff it contains some other value,
+        # i.e. if it has several values or if its only value differs from `value`.
+        # So every extent takes two bitarray operations instead of the union of all the other values' extents
+        nonempty_objects, multivalued_objects = bitarray(empty_extent), bitarray(empty_extent)
+        nonempty_objects[[i for i, pattern in enumerate(data) if len(pattern) > 0]] = True
+        multivalued_objects[[i for i, pattern in enumerate(data) if len(pattern) > 1]] = True
+
+        # The support of every extent is computed before the extent itself, so rare patterns allocate no bitarrays
+        singlevalued_objects = nonempty_objects & ~multivalued_objects
+        n_multivalued, n_singlevalued = multivalued_objects.count(), singlevalued_objects.count()
 
         for value in reversed(sorted(vals_extents)):
-            pattern = frozenset(vals_extents) - {value}
-            extent = reduce(fbarray.__or__, (vals_extents[v] for v in pattern), empty_extent)
-            if extent.count() < min_support:
+            support = n_multivalued + n_singlevalued - count_and(singlevalued_objects, vals_extents[value])
+            if support < min_support:
                 continue
+            pattern = frozenset(vals_extents) - {value}
+            extent = fbarray(multivalued_objects | (nonempty_objects & ~vals_extents[value]))
             yield pattern, extent
 
     def n_attributes(self, data: list[PatternType], min_support: Union[int, float] = 0, use_tqdm: bool = False)\
@@ -231,13 +244,13 @@ class ConjunctiveSetPS(AbstractPS):
         n_objects = len(data)
         min_support = ceil(n_objects * min_support) if 0 < min_support < 1 else int(min_support)
 
-        empty_extent = bazeros(len(data))
-        vals_extents: dict[T, bitarray] = {}
+        vals_objects: dict[T, list[int]] = {}
         for i, pattern in enumerate(data):
             for v in pattern:
-                if v not in vals_extents:
-                    vals_extents[v] = empty_extent.copy()
-                vals_extents[v][i] = True
+                vals_objects.setdefault(v, []).append(i)
+
+        vals_extents: dict[T, bitarray] = {
+            v: bfuncs.indices_to_bitarray(objects, n_objects) for v, objects in vals_objects.items()}
 
         for v in sorted(vals_extents):
             extent = vals_extents[v]
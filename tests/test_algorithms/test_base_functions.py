@@ -0,0 +1,16 @@
+from bitarray import bitarray
+
+import paspailleur.algorithms.base_functions as bfuncs
+import paspailleur.pattern_structures.built_in_patterns as bip
+
+
+def test_indices_to_bitarray():
+    assert bfuncs.indices_to_bitarray([0, 2], 4) == bitarray('1010')
+    assert bfuncs.indices_to_bitarray(iter([3]), 4) == bitarray('0001')
+    assert bfuncs.indices_to_bitarray([], 3) == bitarray('000')
+
+
+def test_group_objects_by_patterns():
+    patterns = [bip.ItemSetPattern({1, 2}), bip.ItemSetPattern({3}), bip.ItemSetPattern({1, 2})]
+    objects_by_patterns = bfuncs.group_objects_by_patterns(patterns)
+    assert objects_by_patterns == {patterns[0]: bitarray('101'), patterns[1]: bitarray('010')}
@@ -1,10 +1,85 @@
 from collections import OrderedDict
+from functools import reduce
 
 from bitarray import bitarray, frozenbitarray as fbarray
+from bitarray.util import zeros as bazeros
 
 import paspailleur.algorithms.base_functions as bfuncs
 import paspailleur.pattern_structures.built_in_patterns as bip
 import paspailleur.algorithms.mine_equivalence_classes as mec
+from paspailleur.pattern_structures import ConjunctiveSetPS, IntervalPS, BoundStatus
+
+
+def test_list_intents_via_Lindig_complex():
+    ps = ConjunctiveSetPS()
+    data = list(ps.preprocess_data([{'a', 'b'}, {'b', 'c'}, {'a', 'c'}, {'a'}]))
+    intents_true = [
+        {'a', 'b', 'c'}, {'a', 'b'}, {'b', 'c'}, {'a', 'c'}, {'b'}, {'a'}, {'c'}, set()
+    ]
+    intents = mec.list_intents_via_Lindig_complex(data, ps)
+    assert intents == intents_true
+
+    ps = IntervalPS()
+    data = list(ps.preprocess_data([1, 2, 3, 5]))
+    intents_true = [ps.max_pattern, (1, 1), (2, 2), (3, 3), (5, 5), (3, 5), (2, 3), (2, 5), (1, 2), (1, 3), (1, 5)]
+    intents_true = [intent if intent == ps.max_pattern else tuple(intent) + (BoundStatus.CLOSED,)
+                    for intent in intents_true]
+    intents = mec.list_intents_via_Lindig_complex(data, ps)
+    assert intents == intents_true
+
+
+def test_list_intents_via_Lindig_complex_traversal_order():
+    def list_intents_via_scan(data, ps):
+        """Lindig algorithm choosing the next concept by scanning all the found extents (the reference traversal)"""
+        _, rows = ps.binarize(data)
+        extents, extents_bits = [], {}
+
+        def add_extent(extent):
+            extents.append(extent)
+            bits = ~bazeros(len(rows[0]))
+            for i in extent.search(True):
+                bits &= rows[i]
+            extents_bits[extent] = bits
+
+        concept_extent = fbarray(bazeros(len(data)))
+        add_extent(concept_extent)
+        while True:
+            outer_objects = ~concept_extent
+            min_set = bitarray(outer_objects)
+            for g in outer_objects.search(True):
+                intent = ps.intent(data, list(concept_extent.search(True)) + [g])
+                parent = bazeros(len(data))
+                parent[list(ps.extent(data, intent))] = True
+                new_objects = parent & outer_objects
+                new_objects[g] = False
+                if (min_set & new_objects).any():
+                    min_set[g] = False
+                elif fbarray(parent) not in extents_bits:
+                    add_extent(fbarray(parent))
+
+            concept_bits, next_extent = extents_bits[concept_extent], None
+            for extent in extents:
+                bits = extents_bits[extent]
+                if bits < concept_bits and (next_extent is None or bits > extents_bits[next_extent]):
+                    next_extent = extent
+            if next_extent is None:
+                break
+            concept_extent = next_extent
+        return [ps.intent(data, extent.search(True)) for extent in extents]
+
+    ps = ConjunctiveSetPS()
+    data = list(ps.preprocess_data([
+        {'Hiking', 'Observing Nature', 'Sightseeing Flights'}, {'Hiking', 'Observing Nature'},
+        {'Hiking', 'Jet Boating', 'Observing Nature', 'Sightseeing Flights'},
+        {'Bungee Jumping', 'Hiking', 'Jet Boating', 'Sightseeing Flights', 'Skiing'},
+        {'Bungee Jumping', 'Hiking', 'Jet Boating', 'Sightseeing Flights', 'Wildwater Rafting'},
+        {'Hiking', 'Skiing'}, {'Jet Boating', 'Wildwater Rafting'}, {'a', 'b'}, {'b', 'c'}, {'a', 'c'}, {'a'}
+    ]))
+    assert mec.list_intents_via_Lindig_complex(data, ps) == list_intents_via_scan(data, ps)
+
+    ps = IntervalPS()
+    data = list(ps.preprocess_data([1, 2, 3, 5, 8, 2, 13]))
+    assert mec.list_intents_via_Lindig_complex(data, ps) == list_intents_via_scan(data, ps)
 
 
 def test_iter_intents_via_ocbo():
@@ -52,6 +127,19 @@ def test_iter_intents_via_ocbo():
     assert intents == intents_true
 
 
+def test_iter_intents_via_ocbo_normalises_intents():
+    # the descriptions contain ngrams nested into other ngrams, which the meet of patterns drops
+    data = [bip.NgramSetPattern(['f c e e b', 'e']), bip.NgramSetPattern(['a b']), bip.NgramSetPattern(['c e e'])]
+    intents = dict((fbarray(extent), intent) for intent, extent in mec.iter_intents_via_ocbo(data))
+    assert intents[fbarray('100')] == bip.NgramSetPattern(['f c e e b'])
+    assert intents[fbarray('100')].value == frozenset({tuple('fceeb')})
+    for extent, intent in intents.items():
+        if not extent.any():
+            continue
+        objects_patterns = [data[g] for g in extent.search(True)]
+        assert intent.value == reduce(bip.NgramSetPattern.__and__, objects_patterns, objects_patterns[0]).value
+
+
 def test_iter_all_patterns_ascending():
     #######################################################################
     # Tests for ItemSetPattern where all atomic patterns are incomparable #
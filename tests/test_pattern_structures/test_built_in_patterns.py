@@ -146,6 +146,49 @@ def test_ClosedIntervalPattern():
     assert bip.ClosedIntervalPattern(125) == bip.ClosedIntervalPattern([125, 125])
 
 
+def test_ClosedIntervalPattern_bounds_universe():
+    class CIPattern(bip.ClosedIntervalPattern):
+        BoundsUniverse = [10, 0, 5]
+
+    # the bounds are widened to the closest values of BoundsUniverse
+    assert CIPattern((1, 7)).value == (0, 10)
+    assert CIPattern([5, 5]).value == (5, 5)
+    assert CIPattern((1, 7)) == CIPattern('[1, 7]')
+    assert CIPattern((-math.inf, 7)).value == (-math.inf, 10)
+    assert CIPattern((1, math.inf)).value == (0, math.inf)
+
+    with pytest.raises(ValueError):
+        CIPattern((-1, 7))
+    with pytest.raises(ValueError):
+        CIPattern((1, 11))
+
+    # the maximal pattern 'ø' is stored as (0, 0), which is not snapped even if BoundsUniverse has no 0
+    CIPattern.BoundsUniverse = [10, 15, 20]
+    a, b = CIPattern((12, 18)), CIPattern((16, 20))
+    assert a.value == (10, 20)
+    assert CIPattern('ø') == a.max_pattern
+    assert a.max_pattern.value == (0, 0)
+    assert repr(a.max_pattern) == 'ø'
+    assert repr(b) == '[15.0, 20.0]'
+    assert a & b == a
+    assert a | b == b
+    assert b <= a.max_pattern
+    assert CIPattern((10, 10)) | CIPattern((20, 20)) == a.max_pattern
+    assert CIPattern((20, 10)) == a.max_pattern
+
+    # BoundsUniverse can be changed in place
+    CIPattern.BoundsUniverse = [0, 10]
+    assert CIPattern((1, 7)).value == (0, 10)
+    CIPattern.BoundsUniverse.append(5)
+    assert CIPattern((1, 7)).value == (0, 10)
+    CIPattern.BoundsUniverse.append(1)
+    assert CIPattern((1, 4)).value == (1, 5)
+
+    CIPattern.BoundsUniverse = None
+    assert CIPattern((1, 7)).value == (1, 7)
+    assert CIPattern((-1, 11)).value == (-1, 11)
+
+
 def test_NgramSetPattern():
     a = bip.NgramSetPattern({('hello', 'world')})
     a2 = bip.NgramSetPattern(['hello     world   '])
@@ -212,6 +255,20 @@ def test_parse_string_description():
     value_parsed = bip.ItemSetPattern.parse_string_description('[abc]')
     assert value == value_parsed
 
+    # sets and single scalars
+    assert bip.ItemSetPattern.parse_string_description('{1, 2}') == {1, 2}
+    assert bip.ItemSetPattern.parse_string_description("{'a', (1, 2)}") == {'a', (1, 2)}
+    assert bip.ItemSetPattern.parse_string_description('[(1,2),(3,4)]') == {(1, 2), (3, 4)}
+    assert bip.ItemSetPattern.parse_string_description('1') == {1}
+    assert bip.ItemSetPattern.parse_string_description('1.5') == {1.5}
+    assert bip.ItemSetPattern.parse_string_description('None') == {None}
+    assert bip.ItemSetPattern.parse_string_description('a') == {'a'}
+    assert bip.ItemSetPattern.parse_string_description('1,a') == {1, 'a'}
+
+    # the descriptions are parsed as literals, never run as Python code
+    assert bip.ItemSetPattern.parse_string_description('1+1') == {'1+1'}
+    assert bip.ItemSetPattern.parse_string_description("len('abc')") == {"len('abc')"}
+
 
 def test_CartesianPattern():
     value = frozendict({
@@ -266,3 +323,27 @@ def test_CartesianPattern():
     max_true = bip.CartesianPattern({'age': bip.ClosedIntervalPattern('ø')})
     max_ = x.max_pattern
     assert max_ == max_true
+
+
+def test_atomic_patterns_follow_class_parameters():
+    class CPattern(bip.CategorySetPattern):
+        Universe = frozenset('abc')
+
+    p = CPattern(['a'])
+    assert p.atomic_patterns == {CPattern(['a', 'b']), CPattern(['a', 'c'])}
+    CPattern.Universe = frozenset('abcd')
+    assert p.atomic_patterns == CPattern(['a']).atomic_patterns
+    assert p.atomic_patterns == {CPattern(['a', 'b', 'c']), CPattern(['a', 'b', 'd']), CPattern(['a', 'c', 'd'])}
+
+    class IPattern(bip.IntervalPattern):
+        BoundsUniverse = [0, 5, 10]
+
+    p = IPattern('[0, 10]')
+    assert IPattern('[0, inf]') in p.atomic_patterns
+    IPattern.BoundsUniverse = [-1, 1, 11]
+    assert p.atomic_patterns == IPattern('[0, 10]').atomic_patterns
+    assert IPattern('[-1, inf]') in p.atomic_patterns
+
+    # the atomic patterns also follow the changes of BoundsUniverse made in place
+    IPattern.BoundsUniverse.append(-0.5)
+    assert ((-0.5, True), (math.inf, True)) in {atom.value for atom in p.atomic_patterns}
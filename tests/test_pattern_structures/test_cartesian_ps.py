@@ -1,4 +1,5 @@
 from paspailleur.pattern_structures import CartesianPS, IntervalPS, DisjunctiveSetPS, ConjunctiveSetPS, NgramPS, BoundStatus as BS
+from paspailleur.pattern_structures.abstract_ps import AbstractPS
 import math
 from bitarray import frozenbitarray as fbarray
 
@@ -92,6 +93,15 @@ def test_intent():
     cps = CartesianPS(basic_structures=[IntervalPS(), IntervalPS()])
     assert cps.intent(data) == ((0, 2, BS.CLOSED), (10, 20, BS.CLOSED))
 
+    # the column-wise intent is the same as the join of all the rows
+    cps = CartesianPS(basic_structures=[IntervalPS(), ConjunctiveSetPS(), NgramPS()])
+    data = list(cps.preprocess_data([
+        [1, {'a', 'b'}, 'hello world'], [5, {'b', 'c'}, 'hello there world'], [3, {'b'}, 'world hello']
+    ]))
+    for indices in [None, [0], [0, 1], [1, 2], [0, 1, 2], []]:
+        assert cps.intent(data, indices) == AbstractPS.intent(cps, data, indices)
+    assert cps.intent(data, []) == cps.max_pattern
+
 
 def test_extent():
     data = [
@@ -1,6 +1,7 @@
 import pytest
 
 from paspailleur.pattern_structures.ngram_ps import NgramPS
+from paspailleur.pattern_structures.abstract_ps import AbstractPS
 
 from bitarray import frozenbitarray as fbarray
 
@@ -72,6 +73,20 @@ def test_ngram_join_patterns():
     assert ps.join_patterns({('a', 'b')}, {('a',)}) == {('a',)}
 
 
+def test_ngram_intent():
+    ps = NgramPS()
+    data = list(ps.preprocess_data(['hello world', 'hello there world', 'world hello', 'hi', 'hello world !']))
+    for indices in [None, [0], [0, 1], [0, 1, 2], [0, 4], [2, 3, 4], []]:
+        assert ps.intent(data, indices) == AbstractPS.intent(ps, data, indices)
+    assert ps.intent(data, [0, 1]) == {('hello',), ('world',)}
+    assert ps.intent(data, []) == ps.max_pattern
+
+    # no more rows are joined once no common ngram is left
+    indices = iter([0, 3, 1, 2])
+    assert ps.intent(data, indices) == ps.min_pattern
+    assert list(indices) == [1, 2]
+
+
 def test_ngram_meet_patterns():
     ps = NgramPS()
     assert ps.meet_patterns({('hello', 'world')}, {('hello', 'there')}) == frozenset({('hello', 'world'), ('hello', 'there')})
@@ -170,3 +185,11 @@ def test_keys():
     assert set(ps.keys(frozenset({('a', 'b'), ('c',)}), data)) == {frozenset({('b',)})}
     assert ps.keys(frozenset({('c', 'a')}), data) == [frozenset({('c', 'a')})]
     assert ps.keys(frozenset({('a',), ('c',)}), data) == [frozenset({('c',)})]
+
+
+def test_filter_max_ngrams():
+    ps = NgramPS()
+    assert ps.filter_max_ngrams(frozenset()) == frozenset()
+    assert ps.filter_max_ngrams({tuple('ab'), tuple('b'), tuple('abc'), tuple('cb')}) == {tuple('abc'), tuple('cb')}
+    assert ps.filter_max_ngrams({('word',), ('word_suffix',)}) == {('word',), ('word_suffix',)}
+    assert ps.filter_max_ngrams({('a', 'b'), ('xa', 'b')}) == {('a', 'b'), ('xa', 'b')}
@@ -1,12 +1,16 @@
 from collections import OrderedDict
+import pickle
+from copy import deepcopy
 from collections.abc import Iterator
+from functools import reduce
+from itertools import combinations
 
 import pytest
 
 from paspailleur.pattern_structures.pattern_structure import PatternStructure
 from paspailleur.pattern_structures.pattern import Pattern
 from paspailleur.pattern_structures import built_in_patterns as bip
-from paspailleur.algorithms import mine_equivalence_classes as mec
+from paspailleur.algorithms import mine_equivalence_classes as mec, base_functions as bfuncs
 
 from bitarray import frozenbitarray as fbarray, bitarray
 
@@ -40,6 +44,13 @@ def test_fit():
     ps.fit(context)
     assert ps._atomic_patterns is not None
 
+    # PatternStructures fitted on the same data do not share their data structures
+    ps_other = PatternStructure()
+    ps_other.fit(context)
+    assert ps_other._object_irreducibles is not ps._object_irreducibles
+    assert ps_other._object_names is not ps._object_names
+    assert ps_other._atomic_patterns is not ps._atomic_patterns
+
 
 def test_extent():
     patterns = [Pattern(frozenset({1, 2, 3})), Pattern(frozenset({0, 4})), Pattern(frozenset({1, 2, 4}))]
@@ -61,6 +72,12 @@ def test_extent():
     assert ps.extent(Pattern(frozenset()), return_bitarray=True) == fbarray('111')
     assert ps.extent(Pattern(frozenset({1, 2, 3, 4})), return_bitarray=True) == fbarray('000')
 
+    # a copy of PatternStructure computes the extents from its own data
+    ps_copy = deepcopy(ps)
+    ps_copy.fit({'d': patterns[1], 'e': patterns[0]})
+    assert ps_copy.extent(Pattern(frozenset({4}))) == {'d'}
+    assert ps.extent(Pattern(frozenset({4}))) == {'b', 'c'}
+
 
 def test_intent():
     patterns = [Pattern(frozenset({1, 2, 3})), Pattern(frozenset({0, 4})), Pattern(frozenset({1, 2, 4}))]
@@ -76,6 +93,18 @@ def test_intent():
     assert ps.intent({'b', 'c'}) == Pattern(frozenset({4}))
     assert ps.intent([]) == Pattern(frozenset({0, 1, 2, 3, 4}))
 
+    # a copy of PatternStructure computes the intents from its own data
+    ps_copy = deepcopy(ps)
+    ps_copy.fit({'a': patterns[1], 'b': patterns[2], 'c': patterns[0]})
+    assert ps_copy.intent({'a', 'c'}) == Pattern(frozenset())
+    assert ps.intent({'a', 'c'}) == Pattern(frozenset({1, 2}))
+
+    # a fitted PatternStructure can be pickled, with no memoized results
+    ps_unpickled = pickle.loads(pickle.dumps(ps))
+    assert not ps_unpickled._intents_cache and not ps_unpickled._extents_cache
+    assert ps_unpickled.intent({'a', 'c'}) == Pattern(frozenset({1, 2}))
+    assert ps_unpickled.extent(Pattern(frozenset({4}))) == {'b', 'c'}
+
     context = {
         'Stewart Island': {'Hiking', 'Observing Nature', 'Sightseeing Flights'},
         'Fjordland NP': {'Hiking', 'Observing Nature', 'Sightseeing Flights'},
@@ -101,6 +130,72 @@ def test_intent():
     assert intent == Pattern(frozenset({'Hiking', 'Observing Nature', 'Sightseeing Flights'}))
 
 
+class _CategorySetPattern(bip.CategorySetPattern):
+    Universe = frozenset({'a', 'b', 'c', 'd'})
+
+
+@pytest.mark.parametrize('patterns', [
+    [bip.ItemSetPattern(v) for v in [{1, 2, 3}, {0, 4}, {1, 2, 4}, {1, 2}, {2, 4}]],
+    [_CategorySetPattern(set(v)) for v in ['ab', 'bc', 'abc', 'a', 'bd']],
+    [bip.IntervalPattern(v) for v in ['[1, 5]', '(2, 3]', '>= 4', '< 3', '[0, 0]']],
+    [bip.ClosedIntervalPattern(v) for v in [(1, 5), (2, 3), (4, 4), (0, 10), (3, 8)]],
+    [bip.NgramSetPattern(v) for v in [['hello world', 'foo'], ['hello'], ['hello world !'], ['world foo'], []]],
+    [bip.CartesianPattern({'x': bip.ClosedIntervalPattern(x), 'y': bip.ItemSetPattern(y)})
+     for x, y in [((1, 5), {1, 2}), ((2, 3), {2}), ((4, 4), {1, 2, 3}), ((0, 10), {3}), ((3, 8), {1, 3})]],
+])
+def test_intent_matches_meet_of_objects_patterns(patterns):
+    context = dict(zip('abcde', patterns))
+    ps = PatternStructure()
+    ps.fit(context)
+    assert ps._atomic_patterns is not None  # so the intents are computed in the vertical format
+
+    for extent_size in range(1, len(context) + 1):
+        for extent in combinations(context, extent_size):
+            meet = reduce(patterns[0].__class__.__and__, [context[obj] for obj in extent])
+            assert ps.intent(extent) == meet, extent
+
+
+@pytest.mark.parametrize('patterns', [
+    [bip.ItemSetPattern(v) for v in [{1, 2, 3}, {0, 4}, {1, 2, 4}, {1, 2}, {2, 4}]],
+    [_CategorySetPattern(set(v)) for v in ['ab', 'bc', 'abc', 'a', 'bd']],
+    [bip.NgramSetPattern(v) for v in [['hello world', 'foo'], ['hello'], ['hello world !'], ['world foo bar'],
+                                      ['bar foo world', 'hello !']]],
+])
+@pytest.mark.parametrize('min_atom_support', [0, 2])
+def test_atomic_patterns_order_matches_pairwise_comparison(patterns, min_atom_support):
+    ps = PatternStructure()
+    ps.fit(dict(zip('abcde', patterns)), min_atom_support=min_atom_support)
+    atomic_patterns = list(ps._atomic_patterns)
+
+    for idx, atomic_pattern in enumerate(atomic_patterns):
+        greater_patterns = bitarray([atomic_pattern < other for other in atomic_patterns])
+        assert ps._atomic_patterns_order[idx] == greater_patterns, atomic_pattern
+
+
+def test_atomic_patterns_with_stop_words():
+    class NgramPattern(bip.NgramSetPattern):
+        StopWords = frozenset({'the'})
+
+    context = {'x': NgramPattern(['the cat sat']), 'y': NgramPattern(['a dog ran']), 'z': NgramPattern(['the cat'])}
+    ps = PatternStructure()
+    ps.fit(context)
+
+    # the ngram of stop words is the minimal pattern, which describes every object
+    min_pattern = NgramPattern([])
+    assert min_pattern in ps._atomic_patterns
+    assert ps.extent(min_pattern, return_bitarray=True) == fbarray('111')
+    for atomic_pattern, extent in ps._atomic_patterns.items():
+        assert extent == fbarray(bfuncs.extension(atomic_pattern, ps._object_irreducibles)), atomic_pattern
+
+    atomic_patterns = list(ps._atomic_patterns)
+    for idx, atomic_pattern in enumerate(atomic_patterns):
+        greater_patterns = bitarray([atomic_pattern < other for other in atomic_patterns])
+        assert ps._atomic_patterns_order[idx] == greater_patterns, atomic_pattern
+
+    patterns = [pattern for pattern, _ in ps.iter_patterns(min_support=2)]
+    assert patterns == [min_pattern, NgramPattern(['cat']), NgramPattern(['the cat'])]
+
+
 def test_min_pattern():
     patterns = [Pattern(frozenset({1, 2, 3})), Pattern(frozenset({0, 4})), Pattern(frozenset({1, 2, 4}))]
     context = dict(zip('abc', patterns))